@@ -25,7 +25,7 @@ Common helper functions for extracting data from parsed S-expressions.
 Used by both eeschema and pcbnew converters.
 """
 
-from typing import List, Optional, Tuple, Any
+from typing import List, Optional, Tuple, Any, Dict
 
 
 def find_element(sexp_list: List, name: str) -> Optional[List]:
@@ -49,6 +49,27 @@ def find_elements(sexp_list: List, name: str) -> List[List]:
     return results
 
 
+def bucket_by_head(sexp_list: List) -> Dict[Any, List[List]]:
+    """
+    Group child elements by their head atom in a single pass.
+    
+    Equivalent to calling find_elements() once per name, but walks the list
+    only once. Element order within each bucket is preserved.
+    """
+    buckets: Dict[Any, List[List]] = {}
+    if not isinstance(sexp_list, list):
+        return buckets
+    for item in sexp_list:
+        if isinstance(item, list) and len(item) > 0:
+            head = item[0]
+            bucket = buckets.get(head)
+            if bucket is None:
+                buckets[head] = [item]
+            else:
+                bucket.append(item)
+    return buckets
+
+
 def get_atom_value(sexp_list: List, index: int = 1, default: Any = None) -> Any:
     """Get atom value from S-expression list at given index."""
     if not isinstance(sexp_list, list) or len(sexp_list) <= index:
@@ -84,3 +105,23 @@ def extract_rotation(at: List) -> Optional[int]:
         return rot
     except (ValueError, TypeError, IndexError):
         return None
+
+
+def extract_placement(at: List) -> Tuple[Optional[Tuple[float, float]], Optional[int]]:
+    """Extract (coordinate, rotation) from (at x y [rot]) in a single pass."""
+    if not isinstance(at, list):
+        return None, None
+    n = len(at)
+    if n < 3:
+        return None, None
+    try:
+        coord = (float(at[1]), float(at[2]))
+    except (ValueError, TypeError):
+        # The rotation is still parsed on its own, as extract_rotation does
+        coord = None
+    if n < 4:
+        return coord, None
+    try:
+        return coord, int(float(at[3]))
+    except (ValueError, TypeError):
+        return coord, None
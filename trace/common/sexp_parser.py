@@ -25,12 +25,30 @@ Fast custom recursive parser for KiCad S-expression files.
 Used by both eeschema and pcbnew converters.
 """
 
-from typing import List, Union, Any
+import re
+from sys import intern
+from typing import Any
 
 
 str_delimiters = '\'"'
 
 
+# First characters of atoms that may be numbers. Non-ASCII digits are
+# rare enough to be checked with str.isdigit() only when needed
+_NUMBER_START = frozenset('0123456789.-')
+
+
+# Python's int() and float() syntax for ASCII text, used to tell numbers from
+# other atoms (uuids, hyphenated names, ...) without letting ValueError do it
+_DIGITS = r'[0-9](?:_?[0-9])*'
+_TRAILING_SPACE = r'[ \t\n\r\x0b\x0c]*\Z'
+_INT_MATCH = re.compile(r'[+-]?' + _DIGITS + _TRAILING_SPACE).match
+_FLOAT_MATCH = re.compile(
+    r'[+-]?(?:(?:(?:' + _DIGITS + r')?\.' + _DIGITS + r'|' + _DIGITS + r'\.?)(?:[eE][+-]?' + _DIGITS + r')?'
+    r'|(?i:inf|infinity|nan))' + _TRAILING_SPACE
+).match
+
+
 def pairwise(iterable):
     """Iterate in pairs, such that [a, b, c, d, ...] becomes [(a, b), (c, d), ...]"""
     i = iter(iterable)
@@ -54,8 +72,17 @@ def from_s_atom(obj):
         return obj
     
     first = obj[0]
-    if first.isdigit() or first == '.' or first == '-':
+    if first in _NUMBER_START or (first > '\x7f' and first.isdigit()):
         # Is a number
+        if '.' in obj:
+            # int() never accepts a '.', so go straight to float()
+            try:
+                return float(obj)
+            except ValueError:
+                return obj
+        if not obj.isdecimal() and obj.isascii() and not _INT_MATCH(obj):
+            # Not an integer, so only float syntax ('1e5', '-inf') is left
+            return float(obj) if _FLOAT_MATCH(obj) else obj
         try:
             return to_number(obj)
         except ValueError:
@@ -77,129 +104,87 @@ def from_s_data(obj):
         return from_s_atom(obj)
 
 
+# Tokens of the S-expression syntax: parentheses, quoted strings (which may
+# run unterminated to the end of the text) and unquoted atoms, which extend
+# up to whitespace or ')'. findall() skips the whitespace between tokens.
+_TOKENIZE = re.compile(r'[()]|"(?:[^"\\]|\\.)*(?:"|\\?\Z)|[^\s()"][^\s)]*', re.DOTALL).findall
+
+# Escape sequences recognized inside quoted strings
+_STRING_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', '\\': '\\', '"': '"'}
+
+# A backslash and the character it escapes (empty for a trailing backslash)
+_ESCAPE_SEQUENCE = re.compile(r'\\(.?)', re.DOTALL).sub
+
+
+def _decode_escape(match) -> str:
+    """Decode one escape sequence; unknown ones are kept literally."""
+    char = match.group(1)
+    decoded = _STRING_ESCAPES.get(char)
+    return decoded if decoded is not None else '\\' + char
+
+
+def _unquote(token: str) -> str:
+    """Return the text of a quoted string token with its escapes decoded."""
+    if len(token) > 1 and token[-1] == '"':
+        body = token[1:-1]
+        # An odd run of backslashes before the last quote escapes it, which
+        # means the string was left unterminated at the end of the text
+        if body[-1:] == '\\' and (len(body) - len(body.rstrip('\\'))) % 2:
+            body = token[1:]
+    else:
+        body = token[1:]
+    if '\\' in body:
+        return _ESCAPE_SEQUENCE(_decode_escape, body)
+    return body
+
+
 class SexpParser:
-    """Fast custom recursive S-expression parser."""
+    """Fast S-expression parser built on a regex tokenizer."""
     
     def __init__(self, text: str):
         self.text = text
-        self.pos = 0
-        self.length = len(text)
-    
-    def skip_whitespace(self):
-        """Skip whitespace characters."""
-        while self.pos < self.length and self.text[self.pos].isspace():
-            self.pos += 1
     
     def parse(self) -> Any:
-        """Parse the S-expression string."""
-        self.skip_whitespace()
-        if self.pos >= self.length:
-            return None
-        
-        if self.text[self.pos] == '(':
-            return self.parse_list()
-        else:
-            return self.parse_atom()
-    
-    def parse_list(self) -> List:
-        """Parse a list (parenthesized expression)."""
-        self.pos += 1  # Skip '('
-        result = []
+        """Parse the first S-expression in the text."""
+        # Lists are built iteratively: current is the innermost open list
+        # and stack holds the lists enclosing it
+        stack = []
+        current = None
         
-        while True:
-            self.skip_whitespace()
-            
-            if self.pos >= self.length:
-                raise ValueError("Unclosed parenthesis")
-            
-            if self.text[self.pos] == ')':
-                self.pos += 1
-                break
-            
-            if self.text[self.pos] == '(':
-                result.append(self.parse_list())
+        for token in _TOKENIZE(self.text):
+            char = token[0]
+            if char == '(':
+                nested = []
+                if current is not None:
+                    current.append(nested)
+                    stack.append(current)
+                current = nested
+            elif char == ')':
+                if current is None:
+                    # Stray closing paren where an expression was expected
+                    return ''
+                # Intern the keyword heading the list so repeated keywords
+                # share one string object and compare by identity
+                if current and type(current[0]) is str:
+                    current[0] = intern(current[0])
+                if not stack:
+                    return current
+                current = stack.pop()
             else:
-                result.append(self.parse_atom())
-        
-        return result
-    
-    def parse_atom(self) -> Union[str, int, float]:
-        """Parse an atom (string, number, or identifier)."""
-        self.skip_whitespace()
-        
-        if self.pos >= self.length:
-            return ""
-        
-        # Handle quoted strings
-        if self.text[self.pos] == '"':
-            return self.parse_quoted_string()
-        
-        # Handle numbers and identifiers - read until whitespace or closing paren
-        start = self.pos
-        
-        while self.pos < self.length:
-            char = self.text[self.pos]
-            
-            # Stop on whitespace or closing paren
-            if char.isspace() or char == ')':
-                break
-            
-            self.pos += 1
-        
-        atom = self.text[start:self.pos]
-        return from_s_atom(atom)
-    
-    def parse_quoted_string(self) -> str:
-        """Parse a quoted string with escape sequences."""
-        self.pos += 1  # Skip opening quote
-        result = []
-        
-        while self.pos < self.length:
-            char = self.text[self.pos]
-            
-            if char == '"':
-                # Check if it's escaped
-                if self.pos > 0 and self.text[self.pos - 1] == '\\':
-                    result.append('"')
-                    self.pos += 1
-                    continue
-                else:
-                    self.pos += 1
-                    break
-            
-            if char == '\\' and self.pos + 1 < self.length:
-                next_char = self.text[self.pos + 1]
-                if next_char == 'n':
-                    result.append('\n')
-                    self.pos += 2
-                    continue
-                elif next_char == 't':
-                    result.append('\t')
-                    self.pos += 2
-                    continue
-                elif next_char == 'r':
-                    result.append('\r')
-                    self.pos += 2
-                    continue
-                elif next_char == '\\':
-                    result.append('\\')
-                    self.pos += 2
-                    continue
-                elif next_char == '"':
-                    result.append('"')
-                    self.pos += 2
-                    continue
-            
-            result.append(char)
-            self.pos += 1
+                value = _unquote(token) if char == '"' else from_s_atom(token)
+                if current is None:
+                    return value
+                current.append(value)
         
-        return ''.join(result)
+        if current is not None:
+            raise ValueError("Unclosed parenthesis")
+        return None
 
 
 def parse_sexp(string: str) -> Any:
     """
     Parse a S-expression string into Python objects.
-    Uses a fast custom recursive parser.
+    Uses a fast regex-tokenizing parser.
     """
     parser = SexpParser(string)
     result = parser.parse()
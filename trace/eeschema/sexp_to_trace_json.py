@@ -26,12 +26,17 @@ Uses a fast custom recursive parser to parse S-expressions, then transforms
 the data to match the trace_sch format structure.
 """
 
+import copy
+import hashlib
 import json
 import math
 import re
 import sys
 import os
-from typing import List, Dict, Any, Optional, Tuple, Union, Set
+import itertools
+from collections import OrderedDict, namedtuple
+from operator import itemgetter
+from typing import List, Dict, Any, Optional, Tuple, Union, Set, Iterable
 
 # Handle both module import and direct script execution
 try:
@@ -47,8 +52,8 @@ except (ImportError, ValueError):
 try:
     from ..common.sexp_parser import parse_sexp
     from ..common.sexp_helpers import (
-        find_element, find_elements, get_atom_value,
-        extract_coord, extract_rotation
+        find_element, find_elements, bucket_by_head, get_atom_value,
+        extract_coord, extract_placement
     )
 except (ImportError, ValueError):
     # Fallback for direct script execution
@@ -58,7 +63,7 @@ except (ImportError, ValueError):
     if common_dir not in sys.path:
         sys.path.insert(0, common_dir)
     from sexp_parser import parse_sexp
-    from sexp_helpers import find_element, find_elements, get_atom_value, extract_coord, extract_rotation
+    from sexp_helpers import find_element, find_elements, bucket_by_head, get_atom_value, extract_coord, extract_placement
 
 
 def extract_wire_points(pts: List) -> List[Tuple[float, float]]:
@@ -138,8 +143,7 @@ def extract_pins(symbol: List) -> List[Dict[str, Any]]:
         # Pin position (at) - may not be present in instance, only in library
         at_elem = find_element(pin, 'at')
         if at_elem:
-            pin_info['at'] = extract_coord(at_elem)
-            pin_info['rot'] = extract_rotation(at_elem)
+            pin_info['at'], pin_info['rot'] = extract_placement(at_elem)
         
         pins.append(pin_info)
     
@@ -236,8 +240,7 @@ def extract_library_symbols(sexp_data: List) -> Dict[str, Dict[Tuple[int, int],
                 if not at_elem:
                     continue
                 
-                pin_coord = extract_coord(at_elem)
-                pin_rot = extract_rotation(at_elem)
+                pin_coord, pin_rot = extract_placement(at_elem)
                 
                 if pin_coord:
                     pin_map[str(pin_number)] = (pin_coord[0], pin_coord[1], pin_rot if pin_rot is not None else 0)
@@ -249,6 +252,31 @@ def extract_library_symbols(sexp_data: List) -> Dict[str, Dict[Tuple[int, int],
     return lib_symbols_map
 
 
+def lookup_lib_pins(lib_symbols_map: Dict[str, Dict[Tuple[int, int], Dict[str, Tuple[float, float, int]]]],
+                    lib_id: str, unit: int, body_style: int) -> Optional[Dict[str, Tuple[float, float, int]]]:
+    """
+    Look up the library pin layout for a (lib_id, unit, body_style) triple.
+    
+    Falls back to body_style 1 when the requested body style has no pins.
+    The layouts are computed once per library part by extract_library_symbols,
+    so every instance of the same part shares the same dict.
+    """
+    lib_units = lib_symbols_map.get(lib_id)
+    if not lib_units:
+        return None
+    return lib_units.get((unit, body_style)) or lib_units.get((unit, 1))
+
+
+# Cardinal symbol rotations as (a, b, c, d) in screen coordinates:
+# x' = a*x + b*y, y' = c*x + d*y
+_ROT_LUT = {
+    0: (1, 0, 0, 1),
+    90: (0, 1, -1, 0),     # (x, y) -> (y, -x)
+    180: (-1, 0, 0, -1),   # (x, y) -> (-x, -y)
+    270: (0, -1, 1, 0),    # (x, y) -> (-y, x)
+}
+
+
 def transform_pin_coordinate(pin_offset: Tuple[float, float, int], symbol_pos: Tuple[float, float], 
                              symbol_rot: Optional[int]) -> Tuple[float, float]:
     """
@@ -265,36 +293,22 @@ def transform_pin_coordinate(pin_offset: Tuple[float, float, int], symbol_pos: T
     Returns:
         Transformed (x, y) coordinate
     """
-    x_off, y_off, pin_rot = pin_offset
+    x_off, y_off, _ = pin_offset
     x_pos, y_pos = symbol_pos
     
-    # Normalize pin rotation to 0-360 range
-    pin_rot_norm = pin_rot % 360
-    if pin_rot_norm < 0:
-        pin_rot_norm += 360
-    
     # Apply pin rotation transformation to get the actual connection point
     y_off = -y_off
     
     # Normalize symbol rotation to 0-360 range
-    rot = symbol_rot if symbol_rot is not None else 0
-    rot = rot % 360
-    if rot < 0:
-        rot += 360
+    rot = (symbol_rot if symbol_rot is not None else 0) % 360
     
     # Rotate pin offset around origin by symbol rotation
     # KiCad uses screen coordinates (Y increases downward)
-    if rot == 0:
-        x_rot, y_rot = x_off, y_off
-    elif rot == 90:
-        # 90° CCW in screen coords: (x, y) → (y, -x)
-        x_rot, y_rot = y_off, -x_off
-    elif rot == 180:
-        # 180° CCW in screen coords: (x, y) → (-x, -y)
-        x_rot, y_rot = -x_off, -y_off
-    elif rot == 270:
-        # 270° CCW in screen coords: (x, y) → (-y, x)
-        x_rot, y_rot = -y_off, x_off
+    coeffs = _ROT_LUT.get(rot)
+    if coeffs is not None:
+        a, b, c, d = coeffs
+        x_rot = a * x_off + b * y_off
+        y_rot = c * x_off + d * y_off
     else:
         # For non-cardinal angles, use rotation matrix for screen coordinates
         rad = math.radians(rot)
@@ -307,6 +321,42 @@ def transform_pin_coordinate(pin_offset: Tuple[float, float, int], symbol_pos: T
     return (x_rot + x_pos, y_rot + y_pos)
 
 
+def transform_pin_coordinates(pin_offsets: List[Tuple[float, float, int]], 
+                              symbol_pos: Tuple[float, float], 
+                              symbol_rot: Optional[int]) -> List[Tuple[float, float]]:
+    """
+    Batch form of transform_pin_coordinate for all pins of one symbol instance.
+    
+    The symbol rotation is resolved once per instance instead of once per pin.
+    
+    Args:
+        pin_offsets: List of (x_offset, y_offset, pin_rotation) from library symbol
+        symbol_pos: (x, y) position of symbol instance
+        symbol_rot: Rotation angle in degrees (0, 90, 180, 270)
+    
+    Returns:
+        Transformed (x, y) coordinates, in the same order as pin_offsets
+    """
+    x_pos, y_pos = symbol_pos
+    rot = (symbol_rot if symbol_rot is not None else 0) % 360
+    
+    # Y offsets are negated (library Y up -> screen Y down) before rotating
+    if rot == 0:
+        return [(x_off + x_pos, -y_off + y_pos) for x_off, y_off, _ in pin_offsets]
+    if rot == 90:
+        return [(-y_off + x_pos, -x_off + y_pos) for x_off, y_off, _ in pin_offsets]
+    if rot == 180:
+        return [(-x_off + x_pos, y_off + y_pos) for x_off, y_off, _ in pin_offsets]
+    if rot == 270:
+        return [(y_off + x_pos, x_off + y_pos) for x_off, y_off, _ in pin_offsets]
+    
+    rad = math.radians(rot)
+    cos_r = math.cos(rad)
+    sin_r = math.sin(rad)
+    return [(x_off * cos_r - y_off * sin_r + x_pos, -x_off * sin_r - y_off * cos_r + y_pos)
+            for x_off, y_off, _ in pin_offsets]
+
+
 def find_wires_near_point(point: Tuple[float, float], wires: List[List], 
                           threshold: float = 2.54) -> List[Tuple[float, float]]:
     """Find wire endpoints near a given point."""
@@ -335,11 +385,10 @@ def convert_wires_to_dict_format(wires: List[List]) -> List[Dict[str, Any]]:
         if pts_elem:
             points = extract_wire_points(pts_elem)
             if len(points) >= 2:
-                # Convert tuples to lists for JSON compatibility
-                wire_dict = {
-                    'points': [list(p) for p in points]
-                }
-                wire_dicts.append(wire_dict)
+                # Keep the (x, y) tuples from extract_wire_points: these dicts
+                # are internal to connectivity analysis (never serialized),
+                # and tuples are smaller than lists and hash directly as keys
+                wire_dicts.append({'points': points})
     return wire_dicts
 
 
@@ -410,8 +459,7 @@ def assign_nets_to_wire_islands(wire_islands: List[List[Dict[str, Any]]],
         for symbol in symbols:
             # Get symbol position and rotation
             at_elem = find_element(symbol, 'at')
-            symbol_pos = extract_coord(at_elem) if at_elem else None
-            symbol_rot = extract_rotation(at_elem) if at_elem else None
+            symbol_pos, symbol_rot = extract_placement(at_elem)
             
             if not symbol_pos:
                 continue
@@ -433,10 +481,7 @@ def assign_nets_to_wire_islands(wire_islands: List[List[Dict[str, Any]]],
             body_style = int(get_atom_value(body_style_elem, 1, 1)) if body_style_elem else 1
             
             # Look up library symbol definition
-            lib_pins = lib_symbols_map[lib_id].get((unit, body_style))
-            if not lib_pins:
-                lib_pins = lib_symbols_map[lib_id].get((unit, 1))
-            
+            lib_pins = lookup_lib_pins(lib_symbols_map, lib_id, unit, body_style)
             if not lib_pins:
                 continue
             
@@ -585,6 +630,46 @@ def assign_nets_to_wire_islands(wire_islands: List[List[Dict[str, Any]]],
     return point_to_net
 
 
+def build_position_grid(positions: Iterable[Tuple[float, float]],
+                        cell: float) -> Dict[Tuple[int, int], List[Tuple[float, float]]]:
+    """
+    Bucket positions into a uniform grid with the given cell size.
+    
+    Used together with positions_near() so tolerance matching only looks at
+    the 3x3 cell neighbourhood of a point instead of scanning every position.
+    """
+    grid: Dict[Tuple[int, int], List[Tuple[float, float]]] = {}
+    for pos in positions:
+        key = (math.floor(pos[0] / cell), math.floor(pos[1] / cell))
+        bucket = grid.get(key)
+        if bucket is None:
+            grid[key] = [pos]
+        else:
+            bucket.append(pos)
+    return grid
+
+
+def positions_near(grid: Dict[Tuple[int, int], List[Tuple[float, float]]],
+                   pos: Tuple[float, float], tolerance: float) -> List[Tuple[float, float]]:
+    """
+    Return grid positions within tolerance of pos on both axes.
+    
+    The grid must have been built with a cell size equal to tolerance.
+    """
+    x, y = pos
+    cx = math.floor(x / tolerance)
+    cy = math.floor(y / tolerance)
+    found = []
+    for gx in (cx - 1, cx, cx + 1):
+        for gy in (cy - 1, cy, cy + 1):
+            bucket = grid.get((gx, gy))
+            if bucket:
+                for p in bucket:
+                    if abs(p[0] - x) < tolerance and abs(p[1] - y) < tolerance:
+                        found.append(p)
+    return found
+
+
 def find_labels_at_pin_positions(symbols: List[List], labels: List[List],
                                   lib_symbols_map: Dict[str, Dict[Tuple[int, int], Dict[str, Tuple[float, float, int]]]]) -> Set[Tuple[float, float]]:
     """
@@ -595,6 +680,15 @@ def find_labels_at_pin_positions(symbols: List[List], labels: List[List],
     pin_label_positions = set()
     tolerance = 0.1
     
+    # Index label positions once so each pin only checks nearby labels
+    label_positions = []
+    for label in labels:
+        at_elem = find_element(label, 'at')
+        label_pos = extract_coord(at_elem) if at_elem else None
+        if label_pos:
+            label_positions.append(label_pos)
+    label_grid = build_position_grid(label_positions, tolerance)
+    
     for symbol in symbols:
         lib_id_elem = find_element(symbol, 'lib_id')
         lib_id = get_atom_value(lib_id_elem, 1, None) if lib_id_elem else None
@@ -607,8 +701,7 @@ def find_labels_at_pin_positions(symbols: List[List], labels: List[List],
         
         # Get symbol position and rotation
         at_elem = find_element(symbol, 'at')
-        symbol_pos = extract_coord(at_elem) if at_elem else None
-        symbol_rot = extract_rotation(at_elem) if at_elem else None
+        symbol_pos, symbol_rot = extract_placement(at_elem)
         
         if not symbol_pos:
             continue
@@ -621,14 +714,7 @@ def find_labels_at_pin_positions(symbols: List[List], labels: List[List],
         body_style = int(get_atom_value(body_style_elem, 1, 1)) if body_style_elem else 1
         
         # Look up library symbol definition
-        if lib_id not in lib_symbols_map:
-            continue
-        
-        lib_pins = lib_symbols_map[lib_id].get((unit, body_style))
-        if not lib_pins:
-            # Try with default body_style if not found
-            lib_pins = lib_symbols_map[lib_id].get((unit, 1))
-        
+        lib_pins = lookup_lib_pins(lib_symbols_map, lib_id, unit, body_style)
         if not lib_pins:
             continue
         
@@ -654,16 +740,7 @@ def find_labels_at_pin_positions(symbols: List[List], labels: List[List],
             pin_coord = transform_pin_coordinate((pin_x_off, pin_y_off, pin_rot), symbol_pos, symbol_rot)
             
             # Check if any label is at this pin position
-            for label in labels:
-                at_elem = find_element(label, 'at')
-                if at_elem:
-                    label_pos = extract_coord(at_elem)
-                    if label_pos:
-                        dx = abs(label_pos[0] - pin_coord[0])
-                        dy = abs(label_pos[1] - pin_coord[1])
-                        if dx < tolerance and dy < tolerance:
-                            # This label is at a pin position
-                            pin_label_positions.add(label_pos)
+            pin_label_positions.update(positions_near(label_grid, pin_coord, tolerance))
     
     return pin_label_positions
 
@@ -678,6 +755,15 @@ def find_noconnects_at_pin_positions(symbols: List[List], noconnects: List[List]
     pin_noconnect_positions = set()
     tolerance = 0.1
     
+    # Index noconnect positions once so each pin only checks nearby noconnects
+    noconnect_positions = []
+    for noconnect in noconnects:
+        at_elem = find_element(noconnect, 'at')
+        nc_pos = extract_coord(at_elem) if at_elem else None
+        if nc_pos:
+            noconnect_positions.append(nc_pos)
+    noconnect_grid = build_position_grid(noconnect_positions, tolerance)
+    
     for symbol in symbols:
         # Power symbols are now treated as normal components
         lib_id_elem = find_element(symbol, 'lib_id')
@@ -691,8 +777,7 @@ def find_noconnects_at_pin_positions(symbols: List[List], noconnects: List[List]
         
         # Get symbol position and rotation
         at_elem = find_element(symbol, 'at')
-        symbol_pos = extract_coord(at_elem) if at_elem else None
-        symbol_rot = extract_rotation(at_elem) if at_elem else None
+        symbol_pos, symbol_rot = extract_placement(at_elem)
         
         if not symbol_pos:
             continue
@@ -705,14 +790,7 @@ def find_noconnects_at_pin_positions(symbols: List[List], noconnects: List[List]
         body_style = int(get_atom_value(body_style_elem, 1, 1)) if body_style_elem else 1
         
         # Look up library symbol definition
-        if lib_id not in lib_symbols_map:
-            continue
-        
-        lib_pins = lib_symbols_map[lib_id].get((unit, body_style))
-        if not lib_pins:
-            # Try with default body_style if not found
-            lib_pins = lib_symbols_map[lib_id].get((unit, 1))
-        
+        lib_pins = lookup_lib_pins(lib_symbols_map, lib_id, unit, body_style)
         if not lib_pins:
             continue
         
@@ -738,16 +816,7 @@ def find_noconnects_at_pin_positions(symbols: List[List], noconnects: List[List]
             pin_coord = transform_pin_coordinate((pin_x_off, pin_y_off, pin_rot), symbol_pos, symbol_rot)
             
             # Check if any noconnect is at this pin position
-            for noconnect in noconnects:
-                at_elem = find_element(noconnect, 'at')
-                if at_elem:
-                    nc_pos = extract_coord(at_elem)
-                    if nc_pos:
-                        dx = abs(nc_pos[0] - pin_coord[0])
-                        dy = abs(nc_pos[1] - pin_coord[1])
-                        if dx < tolerance and dy < tolerance:
-                            # This noconnect is at a pin position
-                            pin_noconnect_positions.add(nc_pos)
+            pin_noconnect_positions.update(positions_near(noconnect_grid, pin_coord, tolerance))
     
     return pin_noconnect_positions
 
@@ -771,8 +840,7 @@ def map_pins_to_nets(symbol: List, wires: List[List], junctions: List[List],
     
     # Get symbol position and rotation
     at_elem = find_element(symbol, 'at')
-    symbol_pos = extract_coord(at_elem) if at_elem else None
-    symbol_rot = extract_rotation(at_elem) if at_elem else None
+    symbol_pos, symbol_rot = extract_placement(at_elem)
     
     if not symbol_pos:
         return pin_map
@@ -795,14 +863,7 @@ def map_pins_to_nets(symbol: List, wires: List[List], junctions: List[List],
     body_style = int(get_atom_value(body_style_elem, 1, 1)) if body_style_elem else 1
     
     # Look up library symbol definition
-    if lib_id not in lib_symbols_map:
-        return pin_map
-    
-    lib_pins = lib_symbols_map[lib_id].get((unit, body_style))
-    if not lib_pins:
-        # Try with default body_style if not found
-        lib_pins = lib_symbols_map[lib_id].get((unit, 1))
-    
+    lib_pins = lookup_lib_pins(lib_symbols_map, lib_id, unit, body_style)
     if not lib_pins:
         return pin_map
     
@@ -897,6 +958,10 @@ def map_pins_to_nets(symbol: List, wires: List[List], junctions: List[List],
         # If no net found, use "NONE"
         if not net_name:
             net_name = "NONE"
+        else:
+            # Net names repeat across many pins; intern them so later
+            # same-net comparisons hit the identity fast path
+            net_name = sys.intern(net_name)
         
         # Store mapping
         try:
@@ -940,12 +1005,11 @@ def convert_symbol(symbol: List, wires: List[List], junctions: List[List],
     coord = None
     rot = None
     if at_elem:
-        coord = extract_coord(at_elem)
-        rot = extract_rotation(at_elem)
+        coord, rot = extract_placement(at_elem)
     
     # Extract UUID
     uuid_elem = find_element(symbol, 'uuid')
-    uuid = get_atom_value(uuid_elem, 1, None) if uuid_elem else None
+    uuid = uuid_elem[1] if uuid_elem and len(uuid_elem) > 1 else None
     
     # Extract unit and body_style (default to 1 if not present)
     unit_elem = find_element(symbol, 'unit')
@@ -997,6 +1061,13 @@ def convert_wire(wire: List) -> Optional[Dict[str, Any]]:
     if not isinstance(wire, list) or len(wire) == 0 or wire[0] != 'wire':
         return None
     
+    # Extract UUID
+    uuid_elem = find_element(wire, 'uuid')
+    uuid = uuid_elem[1] if uuid_elem and len(uuid_elem) > 1 else None
+    
+    if not uuid:
+        return None
+    
     # Extract points
     pts_elem = find_element(wire, 'pts')
     if not pts_elem:
@@ -1006,13 +1077,6 @@ def convert_wire(wire: List) -> Optional[Dict[str, Any]]:
     if len(points) < 2:
         return None
     
-    # Extract UUID
-    uuid_elem = find_element(wire, 'uuid')
-    uuid = get_atom_value(uuid_elem, 1, None) if uuid_elem else None
-    
-    if not uuid:
-        return None
-    
     return {
         'type': 'wire',
         'points': [list(p) for p in points],  # Convert tuples to lists for JSON
@@ -1059,19 +1123,18 @@ def convert_glabel(glabel: List) -> Optional[Dict[str, Any]]:
     coord = None
     rot = None
     if at_elem:
-        coord = extract_coord(at_elem)
-        rot = extract_rotation(at_elem)
+        coord, rot = extract_placement(at_elem)
     
     if not coord:
         return None
     
     # Extract UUID
     uuid_elem = find_element(glabel, 'uuid')
-    uuid_value = get_atom_value(uuid_elem, 1, None) if uuid_elem else None
+    uuid_value = uuid_elem[1] if uuid_elem and len(uuid_elem) > 1 else None
     
     # Extract shape (optional)
     shape_elem = find_element(glabel, 'shape')
-    shape = get_atom_value(shape_elem, 1, None) if shape_elem else None
+    shape = shape_elem[1] if shape_elem and len(shape_elem) > 1 else None
     
     result = {
         'type': 'glabel',
@@ -1094,19 +1157,19 @@ def convert_junction(junction: List) -> Optional[Dict[str, Any]]:
     if not isinstance(junction, list) or len(junction) == 0 or junction[0] != 'junction':
         return None
     
-    # Extract position
-    at_elem = find_element(junction, 'at')
-    coord = extract_coord(at_elem) if at_elem else None
-    if not coord:
-        return None
-    
     # Extract UUID
     uuid_elem = find_element(junction, 'uuid')
-    uuid = get_atom_value(uuid_elem, 1, None) if uuid_elem else None
+    uuid = uuid_elem[1] if uuid_elem and len(uuid_elem) > 1 else None
     
     if not uuid:
         return None
     
+    # Extract position
+    at_elem = find_element(junction, 'at')
+    coord = extract_coord(at_elem) if at_elem else None
+    if not coord:
+        return None
+    
     return {
         'type': 'junction',
         'at': list(coord),  # Convert tuple to list for JSON
@@ -1119,19 +1182,19 @@ def convert_noconnect(noconnect: List) -> Optional[Dict[str, Any]]:
     if not isinstance(noconnect, list) or len(noconnect) == 0 or noconnect[0] != 'no_connect':
         return None
     
-    # Extract position
-    at_elem = find_element(noconnect, 'at')
-    coord = extract_coord(at_elem) if at_elem else None
-    if not coord:
-        return None
-    
     # Extract UUID
     uuid_elem = find_element(noconnect, 'uuid')
-    uuid = get_atom_value(uuid_elem, 1, None) if uuid_elem else None
+    uuid = uuid_elem[1] if uuid_elem and len(uuid_elem) > 1 else None
     
     if not uuid:
         return None
     
+    # Extract position
+    at_elem = find_element(noconnect, 'at')
+    coord = extract_coord(at_elem) if at_elem else None
+    if not coord:
+        return None
+    
     return {
         'type': 'noconnect',
         'at': list(coord),  # Convert tuple to list for JSON
@@ -1164,6 +1227,23 @@ def convert_text(text: List) -> Optional[Dict[str, Any]]:
     return result
 
 
+# Fetches (keyword a b c d) operands, e.g. color rgba or text box margins
+_QUAD_GETTER = itemgetter(1, 2, 3, 4)
+
+
+def extract_float_quad(elem: List) -> Optional[List[float]]:
+    """
+    Extract the four numbers following the keyword in (keyword a b c d).
+    
+    The caller guarantees len(elem) >= 5. All four positions are fetched with
+    a single itemgetter call and converted with map(float, ...).
+    """
+    try:
+        return list(map(float, _QUAD_GETTER(elem)))
+    except (ValueError, TypeError):
+        return None
+
+
 def extract_stroke(shape: List) -> Dict[str, Any]:
     """Extract stroke properties from shape element."""
     stroke_elem = find_element(shape, 'stroke')
@@ -1197,14 +1277,9 @@ def extract_fill(shape: List) -> Dict[str, Any]:
     color_elem = find_element(fill_elem, 'color')
     if color_elem and len(color_elem) >= 5:
         # color is like ['color', r, g, b, a]
-        try:
-            r = float(color_elem[1]) if len(color_elem) > 1 else 0
-            g = float(color_elem[2]) if len(color_elem) > 2 else 0
-            b = float(color_elem[3]) if len(color_elem) > 3 else 0
-            a = float(color_elem[4]) if len(color_elem) > 4 else 0
-            result['color'] = [r, g, b, a]
-        except (ValueError, TypeError, IndexError):
-            pass
+        color = extract_float_quad(color_elem)
+        if color is not None:
+            result['color'] = color
     
     return result
 
@@ -1214,6 +1289,12 @@ def convert_bus(bus: List) -> Optional[Dict[str, Any]]:
     if not isinstance(bus, list) or len(bus) == 0 or bus[0] != 'bus':
         return None
     
+    # Extract UUID
+    uuid_elem = find_element(bus, 'uuid')
+    uuid_value = uuid_elem[1] if uuid_elem and len(uuid_elem) > 1 else None
+    if not uuid_value:
+        return None
+    
     # Extract points
     pts_elem = find_element(bus, 'pts')
     if not pts_elem:
@@ -1223,12 +1304,6 @@ def convert_bus(bus: List) -> Optional[Dict[str, Any]]:
     if len(points) < 2:
         return None
     
-    # Extract UUID
-    uuid_elem = find_element(bus, 'uuid')
-    uuid_value = get_atom_value(uuid_elem, 1, None) if uuid_elem else None
-    if not uuid_value:
-        return None
-    
     result = {
         'type': 'bus',
         'points': [list(p) for p in points],  # Convert tuples to lists for JSON
@@ -1243,6 +1318,12 @@ def convert_polyline(polyline: List) -> Optional[Dict[str, Any]]:
     if not isinstance(polyline, list) or len(polyline) == 0 or polyline[0] != 'polyline':
         return None
     
+    # Extract UUID
+    uuid_elem = find_element(polyline, 'uuid')
+    uuid_value = uuid_elem[1] if uuid_elem and len(uuid_elem) > 1 else None
+    if not uuid_value:
+        return None
+    
     # Extract points from pts
     pts_elem = find_element(polyline, 'pts')
     if not pts_elem:
@@ -1252,12 +1333,6 @@ def convert_polyline(polyline: List) -> Optional[Dict[str, Any]]:
     if len(points) < 2:
         return None
     
-    # Extract UUID
-    uuid_elem = find_element(polyline, 'uuid')
-    uuid_value = get_atom_value(uuid_elem, 1, None) if uuid_elem else None
-    if not uuid_value:
-        return None
-    
     result = {
         'type': 'polyline',
         'points': [list(p) for p in points],  # Convert tuples to lists for JSON
@@ -1272,6 +1347,12 @@ def convert_rectangle(rectangle: List) -> Optional[Dict[str, Any]]:
     if not isinstance(rectangle, list) or len(rectangle) == 0 or rectangle[0] != 'rectangle':
         return None
     
+    # Extract UUID
+    uuid_elem = find_element(rectangle, 'uuid')
+    uuid_value = uuid_elem[1] if uuid_elem and len(uuid_elem) > 1 else None
+    if not uuid_value:
+        return None
+    
     # Extract start
     start_elem = find_element(rectangle, 'start')
     start = extract_coord(start_elem) if start_elem else None
@@ -1288,12 +1369,6 @@ def convert_rectangle(rectangle: List) -> Optional[Dict[str, Any]]:
     stroke = extract_stroke(rectangle)
     fill = extract_fill(rectangle)
     
-    # Extract UUID
-    uuid_elem = find_element(rectangle, 'uuid')
-    uuid_value = get_atom_value(uuid_elem, 1, None) if uuid_elem else None
-    if not uuid_value:
-        return None
-    
     return {
         'type': 'rectangle',
         'start': list(start),
@@ -1309,6 +1384,12 @@ def convert_arc(arc: List) -> Optional[Dict[str, Any]]:
     if not isinstance(arc, list) or len(arc) == 0 or arc[0] != 'arc':
         return None
     
+    # Extract UUID
+    uuid_elem = find_element(arc, 'uuid')
+    uuid_value = uuid_elem[1] if uuid_elem and len(uuid_elem) > 1 else None
+    if not uuid_value:
+        return None
+    
     # Extract start
     start_elem = find_element(arc, 'start')
     start = extract_coord(start_elem) if start_elem else None
@@ -1331,12 +1412,6 @@ def convert_arc(arc: List) -> Optional[Dict[str, Any]]:
     stroke = extract_stroke(arc)
     fill = extract_fill(arc)
     
-    # Extract UUID
-    uuid_elem = find_element(arc, 'uuid')
-    uuid_value = get_atom_value(uuid_elem, 1, None) if uuid_elem else None
-    if not uuid_value:
-        return None
-    
     return {
         'type': 'arc',
         'start': list(start),
@@ -1353,6 +1428,12 @@ def convert_bezier(bezier: List) -> Optional[Dict[str, Any]]:
     if not isinstance(bezier, list) or len(bezier) == 0 or bezier[0] != 'bezier':
         return None
     
+    # Extract UUID
+    uuid_elem = find_element(bezier, 'uuid')
+    uuid_value = uuid_elem[1] if uuid_elem and len(uuid_elem) > 1 else None
+    if not uuid_value:
+        return None
+    
     # Extract points from pts
     pts_elem = find_element(bezier, 'pts')
     if not pts_elem:
@@ -1366,12 +1447,6 @@ def convert_bezier(bezier: List) -> Optional[Dict[str, Any]]:
     stroke = extract_stroke(bezier)
     fill = extract_fill(bezier)
     
-    # Extract UUID
-    uuid_elem = find_element(bezier, 'uuid')
-    uuid_value = get_atom_value(uuid_elem, 1, None) if uuid_elem else None
-    if not uuid_value:
-        return None
-    
     return {
         'type': 'bezier',
         'points': [list(p) for p in points],
@@ -1386,6 +1461,12 @@ def convert_circle(circle: List) -> Optional[Dict[str, Any]]:
     if not isinstance(circle, list) or len(circle) == 0 or circle[0] != 'circle':
         return None
     
+    # Extract UUID
+    uuid_elem = find_element(circle, 'uuid')
+    uuid_value = uuid_elem[1] if uuid_elem and len(uuid_elem) > 1 else None
+    if not uuid_value:
+        return None
+    
     # Extract center
     center_elem = find_element(circle, 'center')
     center = extract_coord(center_elem) if center_elem else None
@@ -1402,12 +1483,6 @@ def convert_circle(circle: List) -> Optional[Dict[str, Any]]:
     stroke = extract_stroke(circle)
     fill = extract_fill(circle)
     
-    # Extract UUID
-    uuid_elem = find_element(circle, 'uuid')
-    uuid_value = get_atom_value(uuid_elem, 1, None) if uuid_elem else None
-    if not uuid_value:
-        return None
-    
     return {
         'type': 'circle',
         'center': list(center),
@@ -1423,6 +1498,12 @@ def convert_text_box(text_box: List) -> Optional[Dict[str, Any]]:
     if not isinstance(text_box, list) or len(text_box) == 0 or text_box[0] != 'text_box':
         return None
     
+    # Extract UUID
+    uuid_elem = find_element(text_box, 'uuid')
+    uuid_value = uuid_elem[1] if uuid_elem and len(uuid_elem) > 1 else None
+    if not uuid_value:
+        return None
+    
     # Extract text (first string after 'text_box')
     text_value = get_atom_value(text_box, 1, None)
     if not text_value:
@@ -1430,8 +1511,7 @@ def convert_text_box(text_box: List) -> Optional[Dict[str, Any]]:
     
     # Extract at (position with rotation)
     at_elem = find_element(text_box, 'at')
-    at_coord = extract_coord(at_elem) if at_elem else None
-    rot = extract_rotation(at_elem) if at_elem else None
+    at_coord, rot = extract_placement(at_elem)
     if not at_coord:
         return None
     
@@ -1451,15 +1531,7 @@ def convert_text_box(text_box: List) -> Optional[Dict[str, Any]]:
     margins = None
     if margins_elem and len(margins_elem) >= 5:
         # margins is like ['margins', top, right, bottom, left]
-        try:
-            margins = [
-                float(margins_elem[1]) if len(margins_elem) > 1 else 0,
-                float(margins_elem[2]) if len(margins_elem) > 2 else 0,
-                float(margins_elem[3]) if len(margins_elem) > 3 else 0,
-                float(margins_elem[4]) if len(margins_elem) > 4 else 0
-            ]
-        except (ValueError, TypeError, IndexError):
-            pass
+        margins = extract_float_quad(margins_elem)
     
     # Extract stroke and fill
     stroke = extract_stroke(text_box)
@@ -1482,12 +1554,6 @@ def convert_text_box(text_box: List) -> Optional[Dict[str, Any]]:
         if justify_elem and len(justify_elem) >= 3:
             effects['justify'] = f"{get_atom_value(justify_elem, 1, 'left')} {get_atom_value(justify_elem, 2, 'top')}"
     
-    # Extract UUID
-    uuid_elem = find_element(text_box, 'uuid')
-    uuid_value = get_atom_value(uuid_elem, 1, None) if uuid_elem else None
-    if not uuid_value:
-        return None
-    
     result = {
         'type': 'text_box',
         'text': text_value,
@@ -1513,6 +1579,12 @@ def convert_bus_entry(bus_entry: List) -> Optional[Dict[str, Any]]:
     if not isinstance(bus_entry, list) or len(bus_entry) == 0 or bus_entry[0] != 'bus_entry':
         return None
     
+    # Extract UUID
+    uuid_elem = find_element(bus_entry, 'uuid')
+    uuid_value = uuid_elem[1] if uuid_elem and len(uuid_elem) > 1 else None
+    if not uuid_value:
+        return None
+    
     # Extract at
     at_elem = find_element(bus_entry, 'at')
     at_coord = extract_coord(at_elem) if at_elem else None
@@ -1528,12 +1600,6 @@ def convert_bus_entry(bus_entry: List) -> Optional[Dict[str, Any]]:
     # Extract stroke (no fill for bus_entry)
     stroke = extract_stroke(bus_entry)
     
-    # Extract UUID
-    uuid_elem = find_element(bus_entry, 'uuid')
-    uuid_value = get_atom_value(uuid_elem, 1, None) if uuid_elem else None
-    if not uuid_value:
-        return None
-    
     return {
         'type': 'bus_entry',
         'at': list(at_coord),
@@ -1550,7 +1616,7 @@ def convert_sheet(sheet: List) -> Optional[Dict[str, Any]]:
     
     # Extract UUID (required)
     uuid_elem = find_element(sheet, 'uuid')
-    uuid = get_atom_value(uuid_elem, 1, None) if uuid_elem else None
+    uuid = uuid_elem[1] if uuid_elem and len(uuid_elem) > 1 else None
     if not uuid:
         return None
     
@@ -1572,8 +1638,7 @@ def convert_sheet(sheet: List) -> Optional[Dict[str, Any]]:
     coord = None
     rot = None
     if at_elem:
-        coord = extract_coord(at_elem)
-        rot = extract_rotation(at_elem)
+        coord, rot = extract_placement(at_elem)
     
     # Extract size (optional)
     size_elem = find_element(sheet, 'size')
@@ -1581,47 +1646,37 @@ def convert_sheet(sheet: List) -> Optional[Dict[str, Any]]:
     if size_elem:
         size = extract_coord(size_elem)
     
-    # Extract sheet pins (ins and outs) with coordinates
-    ins = {}
-    outs = {}
-    pin_elements = find_elements(sheet, 'pin')
-    for pin in pin_elements:
-        if len(pin) >= 3:
-            pin_name = get_atom_value(pin, 1, None)
-            pin_type = get_atom_value(pin, 2, None)  # input, output, bidirectional, etc.
-            if pin_name:
-                # Extract pin coordinates and rotation
-                pin_at_elem = find_element(pin, 'at')
-                pin_coord = None
-                pin_rot = None
-                if pin_at_elem:
-                    pin_coord = extract_coord(pin_at_elem)
-                    pin_rot = extract_rotation(pin_at_elem)
-                
-                # Create pin info structure
-                # For now, use pin name as net name (will be connected during routing)
-                net_name = pin_name
-                
-                if pin_coord is not None:
-                    # Store with coordinates
-                    pin_info = {
-                        "net": net_name,
-                        "at": list(pin_coord)  # Convert tuple to list for JSON
-                    }
-                    if pin_rot is not None:
-                        pin_info["rot"] = pin_rot
-                else:
-                    # No coordinates - use simple string format
-                    pin_info = net_name
-                
-                # Map pin to appropriate ins/outs based on type
-                if pin_type == 'input':
-                    ins[pin_name] = pin_info
-                elif pin_type == 'output':
-                    outs[pin_name] = pin_info
-                else:
-                    # Default to outs for bidirectional or unknown
-                    outs[pin_name] = pin_info
+    # Extract sheet pins (ins and outs) with coordinates.
+    # Pins are classified into buckets in one pass; bidirectional and
+    # unknown pin types default to outs.
+    input_pins = []
+    output_pins = []
+    for pin in find_elements(sheet, 'pin'):
+        if len(pin) < 3:
+            continue
+        pin_name = get_atom_value(pin, 1, None)
+        if not pin_name:
+            continue
+        pin_type = get_atom_value(pin, 2, None)  # input, output, bidirectional, etc.
+        
+        # Extract pin coordinates and rotation
+        pin_coord, pin_rot = extract_placement(find_element(pin, 'at'))
+        
+        # For now, use pin name as net name (will be connected during routing)
+        if pin_coord is not None:
+            # Store with coordinates
+            pin_info = {"net": pin_name, "at": list(pin_coord)}
+            if pin_rot is not None:
+                pin_info["rot"] = pin_rot
+        else:
+            # No coordinates - use simple string format
+            pin_info = pin_name
+        
+        bucket = input_pins if pin_type == 'input' else output_pins
+        bucket.append((pin_name, pin_info))
+    
+    ins = dict(input_pins)
+    outs = dict(output_pins)
     
     result = {
         'type': 'sheet',
@@ -1667,19 +1722,18 @@ def convert_hier_label(hier_label: List) -> Optional[Dict[str, Any]]:
     coord = None
     rot = None
     if at_elem:
-        coord = extract_coord(at_elem)
-        rot = extract_rotation(at_elem)
+        coord, rot = extract_placement(at_elem)
     
     if not coord:
         return None
     
     # Extract UUID
     uuid_elem = find_element(hier_label, 'uuid')
-    uuid_value = get_atom_value(uuid_elem, 1, None) if uuid_elem else None
+    uuid_value = uuid_elem[1] if uuid_elem and len(uuid_elem) > 1 else None
     
     # Extract shape (optional)
     shape_elem = find_element(hier_label, 'shape')
-    shape = get_atom_value(shape_elem, 1, None) if shape_elem else None
+    shape = shape_elem[1] if shape_elem and len(shape_elem) > 1 else None
     
     result = {
         'type': 'hier',
@@ -1701,67 +1755,151 @@ def convert_hier_label(hier_label: List) -> Optional[Dict[str, Any]]:
 # Junction ID Assignment and cwire Generation
 # =============================================================================
 
-def assign_junction_ids(statements: List[Dict[str, Any]]) -> None:
+def build_junction_grid(junctions: List[Dict[str, Any]],
+                        tolerance: float = 0.1) -> Dict[Tuple[int, int], List[Tuple[int, Dict[str, Any]]]]:
     """
-    Assign junction IDs (JUNC1, JUNC2, etc.) to all junctions in statements.
+    Bucket junctions into a grid of (list index, junction) entries for
+    repeated find_junction_at_position lookups.
     
-    Modifies statements in place.
+    The cell size equals tolerance, which must be positive and match the
+    tolerance used for the lookups. The grid reflects the junctions at build
+    time; rebuild it after moving, adding or removing junctions.
     """
-    junction_counter = 1
-    for stmt in statements:
-        if stmt.get('type') == 'junction' and 'id' not in stmt:
-            stmt['id'] = f'JUNC{junction_counter}'
-            junction_counter += 1
+    grid: Dict[Tuple[int, int], List[Tuple[int, Dict[str, Any]]]] = {}
+    for index, junction in enumerate(junctions):
+        junc_at = junction.get('at', [])
+        if len(junc_at) >= 2 and math.isfinite(junc_at[0]) and math.isfinite(junc_at[1]):
+            key = (math.floor(junc_at[0] / tolerance), math.floor(junc_at[1] / tolerance))
+            grid.setdefault(key, []).append((index, junction))
+    return grid
 
 
-def find_pin_at_position(pos: Tuple[float, float], 
-                         components: List[Dict[str, Any]], 
-                         tolerance: float = 0.1) -> Optional[Dict[str, Any]]:
+def find_junction_at_position(pos: Tuple[float, float], 
+                              junctions: List[Dict[str, Any]], 
+                              tolerance: float = 0.1,
+                              grid: Optional[Dict[Tuple[int, int], List[Tuple[int, Dict[str, Any]]]]] = None) -> Optional[Dict[str, Any]]:
     """
-    Find a component pin at the given position.
+    Find a junction at the given position.
+    
+    Callers looking up many positions against the same junctions can pass a
+    grid from build_junction_grid (built with the same tolerance), so only
+    the 3x3 neighbourhood of pos is checked instead of every junction.
     
     Returns:
-        Dict with 'ref' and 'pin' keys if found, None otherwise
+        Junction dict if found (the first in list order), None otherwise
     """
-    for comp in components:
-        pins = comp.get('pins', {})
-        comp_at = comp.get('at')
-        if not comp_at:
-            continue
-        
-        # For each pin, we need to check if the position matches
-        # This is a simplified check - in practice we'd need to transform pin positions
-        # based on component position and rotation
-        # For now, we'll rely on the pin positions being stored in the component
-        for pin_num, net_name in pins.items():
-            # We don't have direct pin positions here, so we can't do exact matching
-            # This would require access to library symbols
-            pass
+    if tolerance <= 0:
+        return None
     
-    return None
+    if grid is None:
+        for junction in junctions:
+            junc_at = junction.get('at', [])
+            if len(junc_at) >= 2:
+                dx = abs(junc_at[0] - pos[0])
+                dy = abs(junc_at[1] - pos[1])
+                if dx < tolerance and dy < tolerance:
+                    return junction
+        return None
+    
+    if not (math.isfinite(pos[0]) and math.isfinite(pos[1])):
+        return None
+    cx = math.floor(pos[0] / tolerance)
+    cy = math.floor(pos[1] / tolerance)
+    best = None
+    for gx in (cx - 1, cx, cx + 1):
+        for gy in (cy - 1, cy, cy + 1):
+            for index, junction in grid.get((gx, gy), ()):
+                if best is not None and index >= best[0]:
+                    continue
+                junc_at = junction['at']
+                if abs(junc_at[0] - pos[0]) < tolerance and abs(junc_at[1] - pos[1]) < tolerance:
+                    best = (index, junction)
+    return best[1] if best is not None else None
 
 
-def find_junction_at_position(pos: Tuple[float, float], 
-                              junctions: List[Dict[str, Any]], 
-                              tolerance: float = 0.1) -> Optional[Dict[str, Any]]:
+def flatten_lib_pins(lib_symbols_map: Dict[str, Dict[Tuple[int, int], Dict[str, Tuple[float, float, int]]]]
+                     ) -> Dict[str, Dict[Tuple[int, int, Union[str, int]], Tuple[float, float, int]]]:
     """
-    Find a junction at the given position.
+    Flatten lib_id -> (unit, body_style) -> pin_num into lib_id -> (unit, body_style, pin_num).
+    
+    Pins missing from a body style are filled in from body_style 1 of the same
+    unit, matching the fallback in lookup_lib_pins. Numeric pin numbers are
+    also keyed by int so component pin maps can be looked up without str().
+    """
+    flat_lib = {}
+    for lib_id, units in lib_symbols_map.items():
+        flat = {}
+        for (unit, body_style), pin_map in units.items():
+            layers = [pin_map]
+            fallback = units.get((unit, 1))
+            if body_style != 1 and fallback:
+                layers.insert(0, fallback)
+            for layer in layers:
+                for pin_num, pin_info in layer.items():
+                    flat[(unit, body_style, pin_num)] = pin_info
+                    try:
+                        pin_num_int = int(pin_num)
+                    except ValueError:
+                        continue
+                    if str(pin_num_int) == pin_num:
+                        flat[(unit, body_style, pin_num_int)] = pin_info
+        flat_lib[lib_id] = flat
+    return flat_lib
+
+
+# Component pin found at a wire endpoint during wire chain analysis
+PinAt = namedtuple('PinAt', 'ref pin net')
+
+
+def _q(v: float) -> int:
+    """Quantize a coordinate to integer hundredths (round half away from zero)."""
+    return int(v * 100 + (0.5 if v >= 0 else -0.5))
+
+
+def _unq(pos: Tuple[int, int]) -> List[float]:
+    """Convert a quantized (x, y) key back to a coordinate list."""
+    return [pos[0] / 100, pos[1] / 100]
+
+
+def component_pin_positions(comp: Dict[str, Any],
+                            lib_pin_table: Dict[str, Dict[Tuple[int, int, Union[str, int]], Tuple[float, float, int]]]
+                            ) -> List[Tuple[Tuple[int, int], PinAt]]:
+    """
+    Compute the quantized position of every placed pin of a component statement.
     
     Returns:
-        Junction dict if found, None otherwise
+        List of ((qx, qy), PinAt(ref, pin, net)) entries in pin map order
     """
-    for junction in junctions:
-        junc_at = junction.get('at', [])
-        if len(junc_at) >= 2:
-            dx = abs(junc_at[0] - pos[0])
-            dy = abs(junc_at[1] - pos[1])
-            if dx < tolerance and dy < tolerance:
-                return junction
-    return None
+    symbol = comp.get('symbol')
+    if not symbol or symbol not in lib_pin_table:
+        return []
+    
+    lib_symbol = lib_pin_table[symbol]
+    unit = comp.get('unit', 1)
+    body_style = comp.get('body_style', 1)
+    
+    # Get pin offsets from library symbol
+    placed_pins = []
+    pin_offsets = []
+    for pin_num, net_name in comp.get('pins', {}).items():
+        # Look up pin position in library symbol
+        pin_info = lib_symbol.get((unit, body_style, pin_num)) or lib_symbol.get((unit, 1, pin_num))
+        
+        if pin_info:
+            placed_pins.append((pin_num, net_name))
+            pin_offsets.append(pin_info)
+    
+    # Transform all pin positions of this instance in one batch
+    ref = comp.get('ref')
+    pin_positions = transform_pin_coordinates(pin_offsets, tuple(comp.get('at', [0, 0])), comp.get('rot', 0))
+    return [((_q(pin_pos[0]), _q(pin_pos[1])), PinAt(ref, pin_num, net_name))
+            for (pin_num, net_name), pin_pos in zip(placed_pins, pin_positions)]
 
 
-def analyze_wire_chains(statements: List[Dict[str, Any]], 
-                        lib_symbols_map: Dict[str, Dict]) -> Tuple[List[Dict[str, Any]], Set[str]]:
+def analyze_wire_chains(components: List[Dict[str, Any]],
+                        wires: List[Dict[str, Any]],
+                        junctions: List[Dict[str, Any]],
+                        lib_pin_table: Dict[str, Dict[Tuple[int, int, Union[str, int]], Tuple[float, float, int]]]) -> Tuple[List[Dict[str, Any]], Set[str]]:
     """
     Analyze wire connectivity and generate cwire and cwiredef statements where possible.
     
@@ -1773,18 +1911,20 @@ def analyze_wire_chains(statements: List[Dict[str, Any]],
     For each cwire, a corresponding cwiredef is generated with the wire path coordinates.
     
     Args:
-        statements: List of trace_sch statements
-        lib_symbols_map: Map of library symbols for pin position lookup
+        components: Component statements
+        wires: Wire statements
+        junctions: Junction statements
+        lib_pin_table: Flattened library pin table from flatten_lib_pins()
     
     Returns:
         Tuple of:
         - List of cwire and cwiredef statements to add
-        - Set of wire UIDs that were consolidated into cwires (should be removed from output)
+        - Set of wire UIDs that were consolidated into cwires (should be removed from output);
+          the matching wire statements are also marked with '_consumed'
     """
-    # Extract relevant statements
-    components = [s for s in statements if s.get('type') == 'component']
-    wires = [s for s in statements if s.get('type') == 'wire']
-    junctions = [s for s in statements if s.get('type') == 'junction']
+    # Chains need wires and at least one pin or junction to start from
+    if not wires or (not components and not junctions) or (not lib_pin_table and not junctions):
+        return [], set()
     
     # Build a map of positions to what's there (pin or junction)
     # For now, we'll focus on junction-based cwires since pin positions
@@ -1794,100 +1934,176 @@ def analyze_wire_chains(statements: List[Dict[str, Any]],
     cwire_counter = 1  # For generating CW1, CW2, etc.
     
     # Build junction position map
-    junction_pos_map: Dict[Tuple[float, float], Dict[str, Any]] = {}
+    # Maps (x, y) -> junction id; only the id is needed downstream
+    junction_pos_map: Dict[Tuple[int, int], str] = {}
     for junction in junctions:
         junc_at = junction.get('at', [])
         if len(junc_at) >= 2:
-            # Round to avoid floating point issues
-            pos = (round(junc_at[0], 2), round(junc_at[1], 2))
-            junction_pos_map[pos] = junction
+            # Quantize to avoid floating point issues
+            pos = (_q(junc_at[0]), _q(junc_at[1]))
+            junction_pos_map[pos] = junction.get('id', 'JUNC?')
     
     # Build component pin position map
-    # This maps (x, y) -> {'ref': ref, 'pin': pin_num, 'net': net_name}
-    pin_pos_map: Dict[Tuple[float, float], Dict[str, Any]] = {}
+    # This maps (x, y) -> PinAt(ref, pin_num, net_name)
+    pin_pos_map: Dict[Tuple[int, int], PinAt] = {}
     
     # For each component, we need to calculate pin positions
-    # This requires the library symbol definitions
+    # This requires the library symbol definitions. Components are processed
+    # serially: the per-component work is pure Python, so a thread pool would
+    # only add contention on the GIL.
     for comp in components:
-        ref = comp.get('ref')
-        symbol = comp.get('symbol')
-        comp_at = comp.get('at', [0, 0])
-        comp_rot = comp.get('rot', 0)
-        unit = comp.get('unit', 1)
-        body_style = comp.get('body_style', 1)
-        pins = comp.get('pins', {})
-        
-        if not symbol or symbol not in lib_symbols_map:
-            continue
-        
-        lib_symbol = lib_symbols_map[symbol]
-        
-        # Get pin positions from library symbol
-        for pin_num, net_name in pins.items():
-            # Look up pin position in library symbol
-            pin_info = lib_symbol.get((unit, body_style), {}).get(str(pin_num))
-            if not pin_info:
-                pin_info = lib_symbol.get((unit, 1), {}).get(str(pin_num))
-            
-            if pin_info:
-                x_off, y_off, pin_rot = pin_info
-                # Transform pin position
-                pin_pos = transform_pin_coordinate((x_off, y_off, pin_rot), 
-                                                   tuple(comp_at), 
-                                                   comp_rot)
-                pos = (round(pin_pos[0], 2), round(pin_pos[1], 2))
-                pin_pos_map[pos] = {
-                    'ref': ref,
-                    'pin': pin_num,
-                    'net': net_name
-                }
-    
-    # Build wire endpoint map
-    # Maps position -> list of wires that have an endpoint there
-    wire_endpoint_map: Dict[Tuple[float, float], List[Dict[str, Any]]] = {}
+        pin_pos_map.update(component_pin_positions(comp, lib_pin_table))
+    
+    if not pin_pos_map and not junction_pos_map:
+        return [], set()
+    
+    # Preprocess wires into parallel lists indexed by wire number, caching
+    # the quantized (start, end) of each wire once, and map each endpoint
+    # position to the indices of the wires that end there.
+    # Wires are identified by uid; wire_keys holds the index of the first
+    # wire with each uid so visited/processed sets work on ints.
+    indexed_wires: List[Dict[str, Any]] = []
+    wire_uids: List[str] = []
+    wire_keys: List[int] = []
+    wire_spans: List[Tuple[Tuple[int, int], Tuple[int, int]]] = []  # (start, end) per wire
+    uid_keys: Dict[str, int] = {}
+    wire_endpoint_map: Dict[Tuple[int, int], List[int]] = {}
     for wire in wires:
         points = wire.get('points', [])
         if len(points) >= 2:
-            start = (round(points[0][0], 2), round(points[0][1], 2))
-            end = (round(points[-1][0], 2), round(points[-1][1], 2))
+            idx = len(wire_uids)
+            uid = wire.get('uid', '')
+            indexed_wires.append(wire)
+            wire_uids.append(uid)
+            wire_keys.append(uid_keys.setdefault(uid, idx))
+            
+            start = (_q(points[0][0]), _q(points[0][1]))
+            end = (_q(points[-1][0]), _q(points[-1][1]))
+            wire_spans.append((start, end))
             
             if start not in wire_endpoint_map:
                 wire_endpoint_map[start] = []
-            wire_endpoint_map[start].append(wire)
+            wire_endpoint_map[start].append(idx)
             
             if end not in wire_endpoint_map:
                 wire_endpoint_map[end] = []
-            wire_endpoint_map[end].append(wire)
+            wire_endpoint_map[end].append(idx)
     
-    def extract_chain_points(chain: List[Dict[str, Any]], start_pos: Tuple[float, float]) -> List[List[float]]:
-        """Extract ordered points from a wire chain starting from start_pos."""
+    def extract_chain_points(chain: List[int], start_pos: Tuple[int, int]) -> List[List[float]]:
+        """Extract ordered points from a chain of wire indices starting from start_pos."""
         if not chain:
             return []
         
-        all_points = [list(start_pos)]
+        # Walk the chain on quantized positions, filling a preallocated list;
+        # positions are converted back to coordinates only at the end
+        chain_positions = [start_pos] * (len(chain) + 1)
         current_pos = start_pos
         
-        for wire in chain:
-            points = wire.get('points', [])
-            if len(points) >= 2:
-                wire_start = (round(points[0][0], 2), round(points[0][1], 2))
-                wire_end = (round(points[-1][0], 2), round(points[-1][1], 2))
-                
-                # Determine which end connects to current_pos
-                if abs(wire_start[0] - current_pos[0]) < 0.1 and abs(wire_start[1] - current_pos[1]) < 0.1:
-                    # Wire starts at current_pos, add end point
-                    all_points.append(list(wire_end))
-                    current_pos = wire_end
-                else:
-                    # Wire ends at current_pos, add start point
-                    all_points.append(list(wire_start))
-                    current_pos = wire_start
+        for i, idx in enumerate(chain, 1):
+            wire_start, wire_end = wire_spans[idx]
+            
+            # Determine which end connects to current_pos
+            # (keys are in 0.01 units, so 10 == 0.1 tolerance)
+            if abs(wire_start[0] - current_pos[0]) < 10 and abs(wire_start[1] - current_pos[1]) < 10:
+                # Wire starts at current_pos, add end point
+                current_pos = wire_end
+            else:
+                # Wire ends at current_pos, add start point
+                current_pos = wire_start
+            chain_positions[i] = current_pos
         
-        return all_points
+        return [_unq(pos) for pos in chain_positions]
     
     # Find wire chains that connect pins/junctions
     # A chain starts at a pin or junction and ends at another pin or junction
-    processed_wires = set()
+    processed_wires: Set[int] = set()
+    
+    def walk_chain(start_idx: int, origin: Tuple[int, int],
+                   from_pin: bool) -> Optional[Tuple[List[int], Tuple[int, int], str]]:
+        """
+        Follow connected wires from origin along start_idx.
+        
+        From a pin, the walk stops at another pin or at any junction. From a
+        junction, it stops at another junction; reaching a pin abandons the
+        chain since pin-to-junction chains are found from the pin side.
+        
+        Returns:
+            (chain of wire indices, destination position, 'pin' or 'junction'),
+            or None on a dead end
+        """
+        # Local aliases keep the per-hop lookups in fast locals
+        keys = wire_keys
+        spans = wire_spans
+        endpoints = wire_endpoint_map
+        pins = pin_pos_map
+        juncs = junction_pos_map
+        
+        chain = [start_idx]
+        visited_wires = {keys[start_idx]}
+        
+        # Get the other end of the first wire
+        start, end = spans[start_idx]
+        current_pos = end if start == origin else start
+        
+        while True:
+            # Check if we've reached a destination (pin or junction)
+            if from_pin:
+                if current_pos in pins and current_pos != origin:
+                    return chain, current_pos, 'pin'
+                if current_pos in juncs:
+                    return chain, current_pos, 'junction'
+            else:
+                if current_pos in juncs and current_pos != origin:
+                    return chain, current_pos, 'junction'
+                if current_pos in pins:
+                    return None
+            
+            # Find next wire in chain
+            for next_idx in endpoints.get(current_pos, ()):
+                next_key = keys[next_idx]
+                if next_key not in visited_wires:
+                    chain.append(next_idx)
+                    visited_wires.add(next_key)
+                    
+                    # Get the other end
+                    start, end = spans[next_idx]
+                    current_pos = end if start == current_pos else start
+                    break
+            else:
+                # Dead end - no cwire possible
+                return None
+    
+    def add_cwire(from_ref: Dict[str, Any], to_ref: Dict[str, Any], net: Optional[str],
+                  chain: List[int], origin: Tuple[int, int]) -> None:
+        """Emit a cwire and its cwiredef, and mark the chain's wires as processed."""
+        nonlocal cwire_counter
+        
+        # Generate cwire ref
+        cwire_ref = f"CW{cwire_counter}"
+        cwire_counter += 1
+        
+        cwire = {
+            'type': 'cwire',
+            'ref': cwire_ref,
+            'from': from_ref,
+            'to': to_ref
+        }
+        if net:
+            cwire['net'] = net
+        results.append(cwire)
+        
+        # Create cwiredef with the wire path
+        chain_points = extract_chain_points(chain, origin)
+        if len(chain_points) >= 2:
+            results.append({
+                'type': 'cwiredef',
+                'ref': cwire_ref,
+                'points': chain_points
+            })
+        
+        # Mark all wires in chain as processed
+        for idx in chain:
+            processed_wires.add(wire_keys[idx])
     
     # Start from each pin position
     for pin_pos, pin_info in pin_pos_map.items():
@@ -1895,267 +2111,81 @@ def analyze_wire_chains(statements: List[Dict[str, Any]],
             continue
         
         # Follow wire chain from this pin
-        for start_wire in wire_endpoint_map[pin_pos]:
-            wire_uid = start_wire.get('uid', '')
-            if wire_uid in processed_wires:
+        for start_idx in wire_endpoint_map[pin_pos]:
+            if wire_keys[start_idx] in processed_wires:
                 continue
             
-            # Follow the chain
-            chain = [start_wire]
-            current_pos = pin_pos
-            visited_wires = {wire_uid}
+            walk = walk_chain(start_idx, pin_pos, True)
+            if walk is None:
+                continue
+            chain, dest_pos, dest_kind = walk
             
-            # Get the other end of the first wire
-            points = start_wire.get('points', [])
-            if len(points) >= 2:
-                start = (round(points[0][0], 2), round(points[0][1], 2))
-                end = (round(points[-1][0], 2), round(points[-1][1], 2))
-                current_pos = end if start == pin_pos else start
+            pin_net = pin_info.net
+            from_ref = {'type': 'pin', 'ref': pin_info.ref, 'pin': pin_info.pin}
+            if dest_kind == 'pin':
+                # Found a pin-to-pin connection; add net if both pins have the same net
+                dest_pin = pin_pos_map[dest_pos]
+                to_ref = {'type': 'pin', 'ref': dest_pin.ref, 'pin': dest_pin.pin}
+                net = pin_net if pin_net == dest_pin.net else None
+            else:
+                # Found a pin-to-junction connection; add net from pin
+                to_ref = {'type': 'junction', 'id': junction_pos_map[dest_pos]}
+                net = pin_net
             
-            # Follow connected wires
-            while True:
-                # Check if we've reached a destination (pin or junction)
-                if current_pos in pin_pos_map and current_pos != pin_pos:
-                    # Found a pin-to-pin connection
-                    dest_pin = pin_pos_map[current_pos]
-                    
-                    # Generate cwire ref
-                    cwire_ref = f"CW{cwire_counter}"
-                    cwire_counter += 1
-                    
-                    # Create cwire
-                    cwire = {
-                        'type': 'cwire',
-                        'ref': cwire_ref,
-                        'from': {'type': 'pin', 'ref': pin_info['ref'], 'pin': pin_info['pin']},
-                        'to': {'type': 'pin', 'ref': dest_pin['ref'], 'pin': dest_pin['pin']}
-                    }
-                    
-                    # Add net if both pins have the same net
-                    if pin_info.get('net') and pin_info['net'] == dest_pin.get('net'):
-                        if pin_info['net'] not in ('NONE', 'DNC'):
-                            cwire['net'] = pin_info['net']
-                    
-                    results.append(cwire)
-                    
-                    # Create cwiredef with the wire path
-                    chain_points = extract_chain_points(chain, pin_pos)
-                    if len(chain_points) >= 2:
-                        cwiredef = {
-                            'type': 'cwiredef',
-                            'ref': cwire_ref,
-                            'points': chain_points
-                        }
-                        results.append(cwiredef)
-                    
-                    # Mark all wires in chain as processed
-                    for w in chain:
-                        processed_wires.add(w.get('uid', ''))
-                    break
-                
-                if current_pos in junction_pos_map:
-                    # Found a pin-to-junction connection
-                    dest_junction = junction_pos_map[current_pos]
-                    
-                    # Generate cwire ref
-                    cwire_ref = f"CW{cwire_counter}"
-                    cwire_counter += 1
-                    
-                    # Create cwire
-                    cwire = {
-                        'type': 'cwire',
-                        'ref': cwire_ref,
-                        'from': {'type': 'pin', 'ref': pin_info['ref'], 'pin': pin_info['pin']},
-                        'to': {'type': 'junction', 'id': dest_junction.get('id', 'JUNC?')}
-                    }
-                    
-                    # Add net from pin
-                    if pin_info.get('net') and pin_info['net'] not in ('NONE', 'DNC'):
-                        cwire['net'] = pin_info['net']
-                    
-                    results.append(cwire)
-                    
-                    # Create cwiredef with the wire path
-                    chain_points = extract_chain_points(chain, pin_pos)
-                    if len(chain_points) >= 2:
-                        cwiredef = {
-                            'type': 'cwiredef',
-                            'ref': cwire_ref,
-                            'points': chain_points
-                        }
-                        results.append(cwiredef)
-                    
-                    # Mark all wires in chain as processed
-                    for w in chain:
-                        processed_wires.add(w.get('uid', ''))
-                    break
-                
-                # Find next wire in chain
-                next_wires = wire_endpoint_map.get(current_pos, [])
-                found_next = False
-                for next_wire in next_wires:
-                    next_uid = next_wire.get('uid', '')
-                    if next_uid not in visited_wires:
-                        chain.append(next_wire)
-                        visited_wires.add(next_uid)
-                        
-                        # Get the other end
-                        points = next_wire.get('points', [])
-                        if len(points) >= 2:
-                            start = (round(points[0][0], 2), round(points[0][1], 2))
-                            end = (round(points[-1][0], 2), round(points[-1][1], 2))
-                            current_pos = end if start == current_pos else start
-                        
-                        found_next = True
-                        break
-                
-                if not found_next:
-                    # Dead end - no cwire possible
-                    break
+            if net in ('NONE', 'DNC'):
+                net = None
+            add_cwire(from_ref, to_ref, net, chain, pin_pos)
     
     # Also check junction-to-junction connections
-    for junc_pos, junction in junction_pos_map.items():
+    for junc_pos, junction_id in junction_pos_map.items():
         if junc_pos not in wire_endpoint_map:
             continue
         
-        for start_wire in wire_endpoint_map[junc_pos]:
-            wire_uid = start_wire.get('uid', '')
-            if wire_uid in processed_wires:
+        for start_idx in wire_endpoint_map[junc_pos]:
+            if wire_keys[start_idx] in processed_wires:
                 continue
             
-            # Follow the chain
-            chain = [start_wire]
-            current_pos = junc_pos
-            visited_wires = {wire_uid}
-            
-            # Get the other end of the first wire
-            points = start_wire.get('points', [])
-            if len(points) >= 2:
-                start = (round(points[0][0], 2), round(points[0][1], 2))
-                end = (round(points[-1][0], 2), round(points[-1][1], 2))
-                current_pos = end if start == junc_pos else start
+            walk = walk_chain(start_idx, junc_pos, False)
+            if walk is None:
+                continue
+            chain, dest_pos, _ = walk
             
-            # Follow connected wires
-            while True:
-                # Check if we've reached another junction
-                if current_pos in junction_pos_map and current_pos != junc_pos:
-                    dest_junction = junction_pos_map[current_pos]
-                    
-                    # Generate cwire ref
-                    cwire_ref = f"CW{cwire_counter}"
-                    cwire_counter += 1
-                    
-                    # Create cwire (junction to junction)
-                    cwire = {
-                        'type': 'cwire',
-                        'ref': cwire_ref,
-                        'from': {'type': 'junction', 'id': junction.get('id', 'JUNC?')},
-                        'to': {'type': 'junction', 'id': dest_junction.get('id', 'JUNC?')}
-                    }
-                    
-                    # Junction-to-junction needs a net name
-                    # Try to infer from connected pins
-                    # For now, skip if we can't determine the net
-                    
-                    results.append(cwire)
-                    
-                    # Create cwiredef with the wire path
-                    chain_points = extract_chain_points(chain, junc_pos)
-                    if len(chain_points) >= 2:
-                        cwiredef = {
-                            'type': 'cwiredef',
-                            'ref': cwire_ref,
-                            'points': chain_points
-                        }
-                        results.append(cwiredef)
-                    
-                    # Mark all wires in chain as processed
-                    for w in chain:
-                        processed_wires.add(w.get('uid', ''))
-                    break
-                
-                # Check if we've reached a pin
-                if current_pos in pin_pos_map:
-                    # This would be a junction-to-pin, but we already handle pin-to-junction
-                    # Skip to avoid duplicates
-                    break
-                
-                # Find next wire in chain
-                next_wires = wire_endpoint_map.get(current_pos, [])
-                found_next = False
-                for next_wire in next_wires:
-                    next_uid = next_wire.get('uid', '')
-                    if next_uid not in visited_wires:
-                        chain.append(next_wire)
-                        visited_wires.add(next_uid)
-                        
-                        # Get the other end
-                        points = next_wire.get('points', [])
-                        if len(points) >= 2:
-                            start = (round(points[0][0], 2), round(points[0][1], 2))
-                            end = (round(points[-1][0], 2), round(points[-1][1], 2))
-                            current_pos = end if start == current_pos else start
-                        
-                        found_next = True
-                        break
-                
-                if not found_next:
-                    break
-    
-    return results, processed_wires
-
-
-def transform_pin_coordinate(pin_offset: Tuple[float, float, int], 
-                             symbol_pos: Tuple[float, float], 
-                             symbol_rot: Optional[int]) -> Tuple[float, float]:
-    """
-    Transform pin offset by symbol position and rotation.
-    
-    Args:
-        pin_offset: (x_offset, y_offset, pin_rotation) from library symbol
-        symbol_pos: (x, y) position of symbol instance
-        symbol_rot: Rotation angle in degrees (0, 90, 180, 270)
+            # Junction-to-junction needs a net name
+            # Try to infer from connected pins
+            # For now, skip if we can't determine the net
+            add_cwire({'type': 'junction', 'id': junction_id},
+                      {'type': 'junction', 'id': junction_pos_map[dest_pos]},
+                      None, chain, junc_pos)
     
-    Returns:
-        Transformed (x, y) coordinate
-    """
-    import math
-    
-    x_off, y_off, pin_rot = pin_offset
-    x_pos, y_pos = symbol_pos
+    # Mark consumed wire statements in place so the caller can drop them
+    # with a single key test (wires sharing a uid are consumed together)
+    for idx, key in enumerate(wire_keys):
+        if key in processed_wires:
+            indexed_wires[idx]['_consumed'] = True
     
-    # Apply pin rotation transformation to get the actual connection point
-    y_off = -y_off
-    
-    # Normalize symbol rotation to 0-360 range
-    rot = symbol_rot if symbol_rot is not None else 0
-    rot = rot % 360
-    if rot < 0:
-        rot += 360
-    
-    # Rotate pin offset around origin by symbol rotation
-    if rot == 0:
-        x_rot, y_rot = x_off, y_off
-    elif rot == 90:
-        x_rot, y_rot = y_off, -x_off
-    elif rot == 180:
-        x_rot, y_rot = -x_off, -y_off
-    elif rot == 270:
-        x_rot, y_rot = -y_off, x_off
-    else:
-        rad = math.radians(rot)
-        cos_r = math.cos(rad)
-        sin_r = math.sin(rad)
-        x_rot = x_off * cos_r + y_off * sin_r
-        y_rot = -x_off * sin_r + y_off * cos_r
-    
-    return (x_rot + x_pos, y_rot + y_pos)
+    return results, {wire_uids[key] for key in processed_wires}
 
 
 # =============================================================================
 # Main Extraction Function
 # =============================================================================
 
+# Element converters that need no schematic-wide context, in output order.
+# These run after wires, labels, junctions and no_connects.
+_CONVERTERS = (
+    ('text', convert_text),
+    ('bus', convert_bus),
+    ('polyline', convert_polyline),
+    ('rectangle', convert_rectangle),
+    ('arc', convert_arc),
+    ('bezier', convert_bezier),
+    ('circle', convert_circle),
+    ('text_box', convert_text_box),
+    ('bus_entry', convert_bus_entry),
+    ('sheet', convert_sheet),
+)
+
+
 def extract_trace_elements(sexp_data: List) -> List[Dict[str, Any]]:
     """Extract and convert all trace_sch elements from parsed S-expression."""
     statements = []
@@ -2200,24 +2230,14 @@ def extract_trace_elements(sexp_data: List) -> List[Dict[str, Any]]:
     # Extract library symbol definitions first
     lib_symbols_map = extract_library_symbols(sexp_data)
     
-    # Separate elements by type
-    symbols = find_elements(all_elements, 'symbol')
-    wires = find_elements(all_elements, 'wire')
-    labels = find_elements(all_elements, 'label')
-    glabels = find_elements(all_elements, 'global_label')
-    hier_labels = find_elements(all_elements, 'hierarchical_label')
-    junctions = find_elements(all_elements, 'junction')
-    noconnects = find_elements(all_elements, 'no_connect')
-    texts = find_elements(all_elements, 'text')
-    buses = find_elements(all_elements, 'bus')
-    polylines = find_elements(all_elements, 'polyline')
-    rectangles = find_elements(all_elements, 'rectangle')
-    arcs = find_elements(all_elements, 'arc')
-    beziers = find_elements(all_elements, 'bezier')
-    circles = find_elements(all_elements, 'circle')
-    text_boxes = find_elements(all_elements, 'text_box')
-    bus_entries = find_elements(all_elements, 'bus_entry')
-    sheets = find_elements(all_elements, 'sheet')
+    # Separate elements by type in a single pass over the top-level list
+    buckets = bucket_by_head(all_elements)
+    symbols = buckets.get('symbol', [])
+    wires = buckets.get('wire', [])
+    labels = buckets.get('label', [])
+    glabels = buckets.get('global_label', [])
+    junctions = buckets.get('junction', [])
+    noconnects = buckets.get('no_connect', [])
     
     # Convert wires and junctions to dict format
     wire_dicts = convert_wires_to_dict_format(wires)
@@ -2236,166 +2256,77 @@ def extract_trace_elements(sexp_data: List) -> List[Dict[str, Any]]:
     pin_noconnect_positions = find_noconnects_at_pin_positions(symbols, noconnects, lib_symbols_map)
     
     # Convert symbols to components (including power symbols - they're treated as normal components now)
+    component_stmts = []
     for symbol in symbols:
         comp = convert_symbol(symbol, wires, junctions, labels, glabels, point_to_net, lib_symbols_map, noconnects)
-        if comp:
+        if comp is not None:
             statements.append(comp)
+            component_stmts.append(comp)
     
     # Extract nets (from point_to_net mapping and labels/global labels)
-    nets = set(point_to_net.values())
-    for label in labels:
-        label_text = get_atom_value(label, 1, None)
-        if label_text:
-            nets.add(label_text)
-    for glabel in glabels:
-        glabel_text = get_atom_value(glabel, 1, None)
-        if glabel_text:
-            nets.add(glabel_text)
-    
-    # Add net statements
-    for net_name in sorted(nets):
-        statements.append({
-            'type': 'net',
-            'name': net_name
-        })
-    
-    # Convert wires
-    for wire in wires:
-        wire_stmt = convert_wire(wire)
-        if wire_stmt:
-            statements.append(wire_stmt)
-    
-    # Convert labels (skip labels that are at pin positions)
-    tolerance = 0.1
-    for label in labels:
-        at_elem = find_element(label, 'at')
-        if at_elem:
-            label_pos = extract_coord(at_elem)
-            if label_pos:
-                # Check if this label is at a pin position (with tolerance)
-                is_pin_label = False
-                for pin_pos in pin_label_positions:
-                    dx = abs(pin_pos[0] - label_pos[0])
-                    dy = abs(pin_pos[1] - label_pos[1])
-                    if dx < tolerance and dy < tolerance:
-                        is_pin_label = True
-                        break
-                if is_pin_label:
-                    continue
-        label_stmt = convert_label(label)
-        if label_stmt:
-            statements.append(label_stmt)
+    nets = dict.fromkeys(point_to_net.values())
+    label_texts = (get_atom_value(label, 1, None) for label in itertools.chain(labels, glabels))
+    nets.update(dict.fromkeys(text for text in label_texts if text))
     
-    # Convert global labels
-    for glabel in glabels:
-        glabel_stmt = convert_glabel(glabel)
-        if glabel_stmt:
-            statements.append(glabel_stmt)
+    # Add net statements (sorted so output is stable across edits)
+    statements.extend({'type': 'net', 'name': net_name} for net_name in sorted(nets))
     
-    # Convert hierarchical labels
-    for hier_label in hier_labels:
-        hier_stmt = convert_hier_label(hier_label)
-        if hier_stmt:
-            statements.append(hier_stmt)
+    # Labels and noconnects at pin positions are folded into the component
+    # pin maps and are not converted to separate statements
+    tolerance = 0.1
+    pin_label_positions_grid = build_position_grid(pin_label_positions, tolerance)
+    pin_noconnect_positions_grid = build_position_grid(pin_noconnect_positions, tolerance)
     
-    # Convert junctions
-    for junction in junctions:
-        junction_stmt = convert_junction(junction)
-        if junction_stmt:
-            statements.append(junction_stmt)
+    def convert_free_label(label: List) -> Optional[Dict[str, Any]]:
+        at_elem = find_element(label, 'at')
+        label_pos = extract_coord(at_elem) if at_elem else None
+        if label_pos and positions_near(pin_label_positions_grid, label_pos, tolerance):
+            return None
+        return convert_label(label)
     
-    # Convert no_connects (skip noconnects that are at pin positions)
-    tolerance = 0.1
-    for noconnect in noconnects:
+    def convert_free_noconnect(noconnect: List) -> Optional[Dict[str, Any]]:
         at_elem = find_element(noconnect, 'at')
-        if at_elem:
-            nc_pos = extract_coord(at_elem)
-            if nc_pos:
-                # Check if this noconnect is at a pin position (with tolerance)
-                is_pin_noconnect = False
-                for pin_pos in pin_noconnect_positions:
-                    dx = abs(pin_pos[0] - nc_pos[0])
-                    dy = abs(pin_pos[1] - nc_pos[1])
-                    if dx < tolerance and dy < tolerance:
-                        is_pin_noconnect = True
-                        break
-                if is_pin_noconnect:
-                    continue
-        noconnect_stmt = convert_noconnect(noconnect)
-        if noconnect_stmt:
-            statements.append(noconnect_stmt)
-    
-    # Convert texts
-    for text in texts:
-        text_stmt = convert_text(text)
-        if text_stmt:
-            statements.append(text_stmt)
-    
-    # Convert buses
-    for bus in buses:
-        bus_stmt = convert_bus(bus)
-        if bus_stmt:
-            statements.append(bus_stmt)
-    
-    # Convert polylines
-    for polyline in polylines:
-        polyline_stmt = convert_polyline(polyline)
-        if polyline_stmt:
-            statements.append(polyline_stmt)
-    
-    # Convert rectangles
-    for rectangle in rectangles:
-        rectangle_stmt = convert_rectangle(rectangle)
-        if rectangle_stmt:
-            statements.append(rectangle_stmt)
-    
-    # Convert arcs
-    for arc in arcs:
-        arc_stmt = convert_arc(arc)
-        if arc_stmt:
-            statements.append(arc_stmt)
-    
-    # Convert beziers
-    for bezier in beziers:
-        bezier_stmt = convert_bezier(bezier)
-        if bezier_stmt:
-            statements.append(bezier_stmt)
-    
-    # Convert circles
-    for circle in circles:
-        circle_stmt = convert_circle(circle)
-        if circle_stmt:
-            statements.append(circle_stmt)
-    
-    # Convert text_boxes
-    for text_box in text_boxes:
-        text_box_stmt = convert_text_box(text_box)
-        if text_box_stmt:
-            statements.append(text_box_stmt)
-    
-    # Convert bus_entries
-    for bus_entry in bus_entries:
-        bus_entry_stmt = convert_bus_entry(bus_entry)
-        if bus_entry_stmt:
-            statements.append(bus_entry_stmt)
-    
-    # Convert sheets
-    for sheet in sheets:
-        sheet_stmt = convert_sheet(sheet)
-        if sheet_stmt:
-            statements.append(sheet_stmt)
-    
-    # Post-processing: Assign junction IDs
-    assign_junction_ids(statements)
+        nc_pos = extract_coord(at_elem) if at_elem else None
+        if nc_pos and positions_near(pin_noconnect_positions_grid, nc_pos, tolerance):
+            return None
+        return convert_noconnect(noconnect)
+    
+    converters = (
+        ('wire', convert_wire),
+        ('label', convert_free_label),
+        ('global_label', convert_glabel),
+        ('hierarchical_label', convert_hier_label),
+        ('junction', convert_junction),
+        ('no_connect', convert_free_noconnect),
+    ) + _CONVERTERS
+    
+    # Convert the remaining elements in statement order, one bucket per type.
+    # Each type lands in a contiguous slice of statements; wire_slice records
+    # where the wires are so consolidated wires can be dropped from it alone.
+    wire_stmts = []
+    wire_slice = slice(0, 0)
+    junction_stmts = []
+    for head, convert in converters:
+        first = len(statements)
+        statements.extend(stmt for stmt in map(convert, buckets.get(head, ())) if stmt is not None)
+        if head == 'wire':
+            wire_slice = slice(first, len(statements))
+            wire_stmts = statements[wire_slice]
+        elif head == 'junction':
+            # Assign junction IDs (JUNC1, JUNC2, etc.) in order
+            junction_stmts = statements[first:]
+            for junction_index, junction_stmt in enumerate(junction_stmts, 1):
+                junction_stmt['id'] = f'JUNC{junction_index}'
     
     # Post-processing: Generate cwires from wire chains
     # This analyzes wire connectivity and creates cwire statements
     # where wires form chains connecting pins and/or junctions
-    cwire_statements, processed_wire_uids = analyze_wire_chains(statements, lib_symbols_map)
+    cwire_statements, processed_wire_uids = analyze_wire_chains(
+        component_stmts, wire_stmts, junction_stmts, flatten_lib_pins(lib_symbols_map))
     
     # Remove wires that were consolidated into cwires
     if processed_wire_uids:
-        statements = [s for s in statements if not (s.get('type') == 'wire' and s.get('uid') in processed_wire_uids)]
+        statements[wire_slice] = [w for w in wire_stmts if '_consumed' not in w]
     
     # Add cwire and cwiredef statements
     statements.extend(cwire_statements)
@@ -2407,22 +2338,49 @@ def extract_trace_elements(sexp_data: List) -> List[Dict[str, Any]]:
 # Main Entry Point
 # =============================================================================
 
-def sexp_to_trace_json(content: str) -> List[Dict[str, Any]]:
+# Converted output of recently seen schematics, keyed by a digest of the
+# content. Entries are private copies; callers always get their own deep copy.
+_conversion_cache: 'OrderedDict[str, List[Dict[str, Any]]]' = OrderedDict()
+_CONVERSION_CACHE_SIZE = 16
+
+
+def sexp_to_trace_json(content: Union[str, bytes]) -> List[Dict[str, Any]]:
     """
     Convert KiCad S-expression content to trace_sch JSON format.
     
+    Results are memoized in-process by content hash, so repeated conversions
+    of an unchanged schematic skip parsing and extraction. Raw UTF-8 bytes
+    are accepted as well; they are hashed as-is and only decoded on a miss.
+    
     Args:
-        content: The .kicad_sch file content as a string
+        content: The .kicad_sch file content as a string or UTF-8 bytes
         
     Returns:
         List of dictionaries, each representing a trace_sch statement
     """
+    if isinstance(content, str):
+        raw = content.encode('utf-8', 'surrogatepass')
+    else:
+        raw = content
+    key = hashlib.blake2b(raw, digest_size=16).hexdigest()
+    cached = _conversion_cache.get(key)
+    if cached is not None:
+        _conversion_cache.move_to_end(key)
+        return copy.deepcopy(cached)
+    
+    if not isinstance(content, str):
+        content = str(content, 'utf-8')
+    
     # Parse S-expression
     sexp_data = parse_sexp(content)
     
     # Extract and convert to trace_sch format
     statements = extract_trace_elements(sexp_data)
     
+    _conversion_cache[key] = copy.deepcopy(statements)
+    if len(_conversion_cache) > _CONVERSION_CACHE_SIZE:
+        _conversion_cache.popitem(last=False)
+    
     return statements
 
 
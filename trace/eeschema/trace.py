@@ -27,18 +27,27 @@ Provides a unified API for converting between:
 - trace_json --> kicad_sch (TODO)
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Optional, Sequence, Tuple
 import sys
 import os
+import re
+import mmap
+import stat
+import functools
+import shutil
+from concurrent.futures import ProcessPoolExecutor
 
-# Handle both module import and direct script execution
-try:
+# Handle both module import and direct script execution. Choosing the branch
+# from __package__ avoids a failed relative import on every script start, and
+# keeps genuine import errors inside the package from being masked.
+if __package__:
     from .trace_parser import parse_trace_sch
     from .trace_converter import convert_to_trace_sch
     from .sexp_to_trace_json import sexp_to_trace_json
     from .trace_json_to_sexp import trace_json_to_sexp
-except (ImportError, ValueError):
-    # Fallback for direct script execution - add current directory to path
+else:
+    # Direct script execution - the sibling modules resolve their own
+    # fallback imports through this directory, so it must be on the path
     script_dir = os.path.dirname(os.path.abspath(__file__))
     if script_dir not in sys.path:
         sys.path.insert(0, script_dir)
@@ -47,6 +56,133 @@ except (ImportError, ValueError):
     from sexp_to_trace_json import sexp_to_trace_json
     from trace_json_to_sexp import trace_json_to_sexp
 
+# Prefer orjson for trace_json file I/O when available; it is considerably
+# faster than the stdlib json module on large statement lists.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    import json
+
+
+# Separators accepted between entries of a library path list
+_PATH_SPLIT = re.compile(r'[;:]')
+
+
+def _parse_path_list(value: str) -> Tuple[str, ...]:
+    """Split a colon/semicolon-separated path list into unique canonical paths."""
+    parts = (p.strip() for p in _PATH_SPLIT.split(value))
+    return tuple(dict.fromkeys(os.path.realpath(p) for p in parts if p))
+
+
+def _read_text(path: str) -> str:
+    """
+    Read a schematic file as text via a read-only memory map.
+
+    The file is decoded straight from the mapped pages, avoiding the
+    intermediate buffer copies and newline translation of a text-mode
+    read(). Both parsers treat a stray carriage return as whitespace.
+    Pipes, other non-regular files and empty files cannot be mapped and
+    are read directly instead.
+    """
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        if not stat.S_ISREG(st.st_mode) or st.st_size == 0:
+            return f.read().decode("utf-8")
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            content = str(mm, "utf-8")
+        finally:
+            mm.close()
+    return content
+
+
+def _read_bytes(path: str) -> bytes:
+    """Read a file's raw bytes."""
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@functools.lru_cache(maxsize=32)
+def _read_existing_sch_cached(path: str, mtime_ns: int, size: int) -> str:
+    """Read an existing kicad_sch file; the stat fields key out stale entries."""
+    return _read_text(path)
+
+
+def _read_existing_sch(path: Optional[str]) -> Optional[str]:
+    """Read an existing kicad_sch file to merge with, or None if there is none."""
+    if not path:
+        return None
+    try:
+        st = os.stat(path)
+        return _read_existing_sch_cached(path, st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        return None
+
+
+# Characters encoded per write; bounds the transient bytes copy of large outputs
+_WRITE_CHUNK = 1 << 20
+
+
+def _write_text(path: str, content: str):
+    """Write text to a file as UTF-8 through a large binary buffer."""
+    with open(path, "wb", buffering=1 << 20) as f:
+        if len(content) <= _WRITE_CHUNK:
+            f.write(content.encode("utf-8"))
+            return
+        for start in range(0, len(content), _WRITE_CHUNK):
+            f.write(content[start:start + _WRITE_CHUNK].encode("utf-8"))
+
+
+def _load_json(path: str) -> Any:
+    """Load a JSON document from a file."""
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    with open(path, "rb") as f:
+        return json.loads(f.read())
+
+
+def _dump_json_array_streaming(items: List[Any], path: str):
+    """
+    Write a list as a compact JSON array one element at a time.
+
+    Only a single element is ever serialized in memory, and each element goes
+    through the C encoder (json.dump itself falls back to the pure-Python one).
+    """
+    with open(path, "wb", buffering=1 << 20) as f:
+        f.write(b"[")
+        first = True
+        for item in items:
+            if not first:
+                f.write(b",")
+            first = False
+            if orjson is not None:
+                f.write(orjson.dumps(item, option=orjson.OPT_NON_STR_KEYS))
+            else:
+                f.write(json.dumps(item, separators=(",", ":")).encode("utf-8"))
+        f.write(b"]")
+
+
+def _dump_json(data: Any, path: str, pretty: bool = False):
+    """Write data to a file as JSON, compact unless pretty is set."""
+    if not pretty and isinstance(data, list):
+        _dump_json_array_streaming(data, path)
+        return
+    if orjson is not None:
+        # Pin maps use integer keys, which orjson rejects without OPT_NON_STR_KEYS
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(data, option=option))
+        return
+    with open(path, "w") as f:
+        if pretty:
+            json.dump(data, f, indent=2)
+        else:
+            json.dump(data, f, separators=(",", ":"))
+
 
 class TraceConverter:
     """
@@ -100,7 +236,20 @@ class TraceConverter:
         return sexp_to_trace_json(kicad_sch_content)
     
     @staticmethod
-    def trace_json_to_kicad_sch(trace_json: List[Dict[str, Any]], existing_sch_content: Optional[str] = None, symbol_paths: List[str] = None) -> str:
+    def kicad_sch_bytes_to_trace_json(kicad_sch_content: bytes) -> List[Dict[str, Any]]:
+        """
+        Convert raw kicad_sch bytes to trace_json (list of statement dicts).
+        
+        Args:
+            kicad_sch_content: The .kicad_sch file content as UTF-8 bytes
+            
+        Returns:
+            List of dictionaries, each representing a statement
+        """
+        return sexp_to_trace_json(kicad_sch_content)
+    
+    @staticmethod
+    def trace_json_to_kicad_sch(trace_json: List[Dict[str, Any]], existing_sch_content: Optional[str] = None, symbol_paths: Sequence[str] = None) -> str:
         """
         Convert trace_json (list of statement dicts) to kicad_sch string.
         
@@ -114,27 +263,46 @@ class TraceConverter:
             Formatted kicad_sch content as string
         """
         return trace_json_to_sexp(trace_json, existing_sch_content=existing_sch_content, symbol_paths=symbol_paths)
+    
+    @staticmethod
+    def trace_sch_to_kicad_sch(trace_sch_content: str, existing_sch_content: Optional[str] = None, symbol_paths: Sequence[str] = None) -> str:
+        """
+        Convert trace_sch string directly to kicad_sch string.
+        
+        The parsed statements are handed straight to the kicad_sch writer and
+        are not retained by the caller, so they can be freed as soon as the
+        conversion finishes.
+        
+        Args:
+            trace_sch_content: The .trace_sch file content as a string
+            existing_sch_content: Optional content of existing kicad_sch file to merge with.
+                                 If None, generates from scratch (backward compatible).
+            symbol_paths: Optional list of symbol library directory paths to search
+        
+        Returns:
+            Formatted kicad_sch content as string
+        """
+        return trace_json_to_sexp(parse_trace_sch(trace_sch_content), existing_sch_content=existing_sch_content, symbol_paths=symbol_paths)
         
     
-    # Convenience methods for file operations
+    # Convenience methods for file operations. These call the conversion
+    # functions directly rather than going back through the class.
     
     @staticmethod
-    def trace_sch_file_to_trace_json_file(trace_sch_path: str, trace_json_path: str):
+    def trace_sch_file_to_trace_json_file(trace_sch_path: str, trace_json_path: str, pretty: bool = False):
         """
         Convert a trace_sch file to a trace_json file.
         
         Args:
             trace_sch_path: Path to input .trace_sch file
             trace_json_path: Path to output JSON file
+            pretty: Indent the JSON output (compact by default)
         """
-        with open(trace_sch_path, "r") as f:
-            content = f.read()
+        content = _read_text(trace_sch_path)
         
-        trace_json = TraceConverter.trace_sch_to_trace_json(content)
+        trace_json = parse_trace_sch(content)
         
-        import json
-        with open(trace_json_path, "w") as f:
-            json.dump(trace_json, f, indent=2)
+        _dump_json(trace_json, trace_json_path, pretty=pretty)
     
     @staticmethod
     def trace_json_file_to_trace_sch_file(trace_json_path: str, trace_sch_path: str):
@@ -145,35 +313,30 @@ class TraceConverter:
             trace_json_path: Path to input JSON file
             trace_sch_path: Path to output .trace_sch file
         """
-        import json
-        with open(trace_json_path, "r") as f:
-            trace_json = json.load(f)
+        trace_json = _load_json(trace_json_path)
         
-        trace_sch_content = TraceConverter.trace_json_to_trace_sch(trace_json)
+        trace_sch_content = convert_to_trace_sch(trace_json)
         
-        with open(trace_sch_path, "w") as f:
-            f.write(trace_sch_content)
+        _write_text(trace_sch_path, trace_sch_content)
     
     @staticmethod
-    def kicad_sch_file_to_trace_json_file(kicad_sch_path: str, trace_json_path: str):
+    def kicad_sch_file_to_trace_json_file(kicad_sch_path: str, trace_json_path: str, pretty: bool = False):
         """
         Convert a kicad_sch file to a trace_json file.
         
         Args:
             kicad_sch_path: Path to input .kicad_sch file
             trace_json_path: Path to output JSON file
+            pretty: Indent the JSON output (compact by default)
         """
-        with open(kicad_sch_path, "r") as f:
-            content = f.read()
+        content = _read_bytes(kicad_sch_path)
         
-        trace_json = TraceConverter.kicad_sch_to_trace_json(content)
+        trace_json = sexp_to_trace_json(content)
         
-        import json
-        with open(trace_json_path, "w") as f:
-            json.dump(trace_json, f, indent=2)
+        _dump_json(trace_json, trace_json_path, pretty=pretty)
     
     @staticmethod
-    def trace_json_file_to_kicad_sch_file(trace_json_path: str, kicad_sch_path: str, existing_sch_path: Optional[str] = None, symbol_paths: List[str] = None):
+    def trace_json_file_to_kicad_sch_file(trace_json_path: str, kicad_sch_path: str, existing_sch_path: Optional[str] = None, symbol_paths: Sequence[str] = None):
         """
         Convert a trace_json file to a kicad_sch file.
         
@@ -184,22 +347,16 @@ class TraceConverter:
                                If None, generates from scratch (backward compatible).
             symbol_paths: Optional list of symbol library directory paths to search
         """
-        import json
-        with open(trace_json_path, "r") as f:
-            trace_json = json.load(f)
+        trace_json = _load_json(trace_json_path)
         
-        existing_sch_content = None
-        if existing_sch_path and os.path.exists(existing_sch_path):
-            with open(existing_sch_path, "r") as f:
-                existing_sch_content = f.read()
+        existing_sch_content = _read_existing_sch(existing_sch_path)
         
-        kicad_sch_content = TraceConverter.trace_json_to_kicad_sch(trace_json, existing_sch_content=existing_sch_content, symbol_paths=symbol_paths)
+        kicad_sch_content = trace_json_to_sexp(trace_json, existing_sch_content=existing_sch_content, symbol_paths=symbol_paths)
         
-        with open(kicad_sch_path, "w") as f:
-            f.write(kicad_sch_content)
+        _write_text(kicad_sch_path, kicad_sch_content)
     
     @staticmethod
-    def trace_sch_file_to_kicad_sch_file(trace_sch_path: str, kicad_sch_path: str, existing_sch_path: Optional[str] = None, symbol_paths: List[str] = None):
+    def trace_sch_file_to_kicad_sch_file(trace_sch_path: str, kicad_sch_path: str, existing_sch_path: Optional[str] = None, symbol_paths: Sequence[str] = None):
         """
         Convert a trace_sch file to a kicad_sch file.
         
@@ -210,20 +367,13 @@ class TraceConverter:
                                If None, generates from scratch (backward compatible).
             symbol_paths: Optional list of symbol library directory paths to search
         """
-        with open(trace_sch_path, "r") as f:
-            content = f.read()
-        
-        trace_json = TraceConverter.trace_sch_to_trace_json(content)
+        content = _read_text(trace_sch_path)
         
-        existing_sch_content = None
-        if existing_sch_path and os.path.exists(existing_sch_path):
-            with open(existing_sch_path, "r") as f:
-                existing_sch_content = f.read()
+        existing_sch_content = _read_existing_sch(existing_sch_path)
         
-        kicad_sch_content = TraceConverter.trace_json_to_kicad_sch(trace_json, existing_sch_content=existing_sch_content, symbol_paths=symbol_paths)
+        kicad_sch_content = trace_json_to_sexp(parse_trace_sch(content), existing_sch_content=existing_sch_content, symbol_paths=symbol_paths)
         
-        with open(kicad_sch_path, "w") as f:
-            f.write(kicad_sch_content)
+        _write_text(kicad_sch_path, kicad_sch_content)
             
     @staticmethod
     def kicad_sch_file_to_trace_sch_file(kicad_sch_path: str, trace_sch_path: str):
@@ -234,22 +384,119 @@ class TraceConverter:
             kicad_sch_path: Path to input .kicad_sch file
             trace_sch_path: Path to output .trace_sch file
         """
-        with open(kicad_sch_path, "r") as f:
-            content = f.read()
+        content = _read_bytes(kicad_sch_path)
+        
+        trace_json = sexp_to_trace_json(content)
+        
+        trace_sch_content = convert_to_trace_sch(trace_json)
+        
+        _write_text(trace_sch_path, trace_sch_content)
+    
+    @staticmethod
+    def convert_file(input_path: str, output_path: str, from_format: str, to_format: str, existing_sch_path: Optional[str] = None, symbol_paths: Sequence[str] = None, pretty: bool = False):
+        """
+        Convert a file between any two supported formats.
+        
+        Converting a format to itself copies the file without parsing it.
+        
+        Args:
+            input_path: Path to input file
+            output_path: Path to output file
+            from_format: Input format ("trace_sch", "trace_json" or "kicad_sch")
+            to_format: Output format ("trace_sch", "trace_json" or "kicad_sch")
+            existing_sch_path: Optional path to existing .kicad_sch file to merge with
+                               (only for conversions to kicad_sch)
+            symbol_paths: Optional list of symbol library directory paths to search
+                          (only for conversions to kicad_sch)
+            pretty: Indent trace_json output (only for conversions to trace_json)
+        
+        Raises:
+            ValueError: If the conversion is not supported
+        """
+        if from_format == to_format:
+            try:
+                # copyfile uses the kernel's zero-copy path where available
+                shutil.copyfile(input_path, output_path)
+            except shutil.SameFileError:
+                pass
+            return
+        
+        convert = _DISPATCH.get((from_format, to_format))
+        if convert is None:
+            raise ValueError(f"Conversion from {from_format} to {to_format} is not supported")
         
-        trace_json = TraceConverter.kicad_sch_to_trace_json(content)
+        convert(input_path, output_path, existing_sch_path=existing_sch_path, symbol_paths=symbol_paths, pretty=pretty)
+    
+    @staticmethod
+    def convert_many(jobs: List[Tuple[str, str, str, str]], workers: Optional[int] = None, symbol_paths: Sequence[str] = None):
+        """
+        Convert many independent files in parallel worker processes.
+        
+        Args:
+            jobs: List of (input_path, output_path, from_format, to_format) tuples
+            workers: Number of worker processes (defaults to the CPU count)
+            symbol_paths: Optional list of symbol library directory paths to search
+                          (used by conversions to kicad_sch)
         
-        trace_sch_content = TraceConverter.trace_json_to_trace_sch(trace_json)
+        Raises:
+            ValueError: If a job requests an unsupported conversion
+        """
+        if not jobs:
+            return
         
-        with open(trace_sch_path, "w") as f:
-            f.write(trace_sch_content)
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            futures = [executor.submit(_run_conversion, job, symbol_paths) for job in jobs]
+            # Surface the first failure, in job order
+            for future in futures:
+                future.result()
     
+# File conversion entry points keyed by (from_format, to_format). Every entry
+# takes the same keyword options and forwards only those its method accepts.
+_DISPATCH: Dict[Tuple[str, str], Callable[..., None]] = {
+    ("trace_sch", "trace_json"): lambda i, o, pretty=False, **_: TraceConverter.trace_sch_file_to_trace_json_file(i, o, pretty=pretty),
+    ("trace_json", "trace_sch"): lambda i, o, **_: TraceConverter.trace_json_file_to_trace_sch_file(i, o),
+    ("kicad_sch", "trace_json"): lambda i, o, pretty=False, **_: TraceConverter.kicad_sch_file_to_trace_json_file(i, o, pretty=pretty),
+    ("trace_json", "kicad_sch"): lambda i, o, existing_sch_path=None, symbol_paths=None, **_: TraceConverter.trace_json_file_to_kicad_sch_file(i, o, existing_sch_path=existing_sch_path, symbol_paths=symbol_paths),
+    ("kicad_sch", "trace_sch"): lambda i, o, **_: TraceConverter.kicad_sch_file_to_trace_sch_file(i, o),
+    ("trace_sch", "kicad_sch"): lambda i, o, existing_sch_path=None, symbol_paths=None, **_: TraceConverter.trace_sch_file_to_kicad_sch_file(i, o, existing_sch_path=existing_sch_path, symbol_paths=symbol_paths),
+}
+
+
+def _run_conversion(job: Tuple[str, str, str, str], symbol_paths: Sequence[str] = None):
+    """Run a single (input, output, from_format, to_format) conversion job."""
+    input_path, output_path, from_format, to_format = job
+    TraceConverter.convert_file(input_path, output_path, from_format, to_format, symbol_paths=symbol_paths)
+
+
+def read_batch_manifest(manifest_path: str) -> List[Tuple[str, str, str, str]]:
+    """
+    Read conversion jobs from a manifest file.
+    
+    Each non-empty line holds whitespace-separated input path, output path,
+    input format and output format. Lines starting with '#' are ignored.
+    
+    Raises:
+        ValueError: If a line does not have exactly four fields
+    """
+    jobs = []
+    with open(manifest_path, "r") as f:
+        for line_num, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            fields = line.split()
+            if len(fields) != 4:
+                raise ValueError(f"{manifest_path}:{line_num}: expected 'input output from to', got {line!r}")
+            jobs.append(tuple(fields))
+    return jobs
+
 # =============================================================================
 # Command-line interface
 # =============================================================================
 
-if __name__ == "__main__":
-    import sys
+@functools.lru_cache(maxsize=None)
+def _get_parser():
+    """Build the command-line argument parser once."""
     import argparse
     
     parser = argparse.ArgumentParser(
@@ -257,24 +504,24 @@ if __name__ == "__main__":
     )
     parser.add_argument(
         "input_file",
+        nargs="?",
         help="Input file path"
     )
     parser.add_argument(
         "output_file",
+        nargs="?",
         help="Output file path"
     )
     parser.add_argument(
         "-f", "--from", 
         dest="from_format",
         choices=["trace_sch", "trace_json", "kicad_sch"],
-        required=True,
         help="Input format"
     )
     parser.add_argument(
         "-t", "--to",
         dest="to_format",
         choices=["trace_sch", "trace_json", "kicad_sch"],
-        required=True,
         help="Output format"
     )
     parser.add_argument(
@@ -292,36 +539,53 @@ if __name__ == "__main__":
         dest="existing_sch_path",
         help="Path to existing .kicad_sch file to merge with (only for trace_sch/trace_json -> kicad_sch conversions)"
     )
+    parser.add_argument(
+        "--pretty",
+        action="store_true",
+        help="Indent trace_json output (compact by default)"
+    )
+    parser.add_argument(
+        "--batch-manifest",
+        dest="batch_manifest",
+        help="File listing 'input output from to' jobs, one per line, to convert in parallel"
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        dest="workers",
+        type=int,
+        help="Number of worker processes for --batch-manifest (default: CPU count)"
+    )
     
+    return parser
+
+
+if __name__ == "__main__":
+    parser = _get_parser()
     args = parser.parse_args()
     
+    if not args.batch_manifest and not (args.input_file and args.output_file and args.from_format and args.to_format):
+        parser.error("input_file, output_file, --from and --to are required unless --batch-manifest is given")
+    
     # Parse library paths if provided
     symbol_paths = None
     if args.symbol_paths:
-        # Handle both colon and semicolon separators
-        symbol_paths = [p.strip() for p in args.symbol_paths.replace(';', ':').split(':') if p.strip()]
-    
-    converter = TraceConverter()
+        symbol_paths = _parse_path_list(args.symbol_paths)
     
     try:
-        # Determine conversion method
-        if args.from_format == "trace_sch" and args.to_format == "trace_json":
-            converter.trace_sch_file_to_trace_json_file(args.input_file, args.output_file)
-        elif args.from_format == "trace_json" and args.to_format == "trace_sch":
-            converter.trace_json_file_to_trace_sch_file(args.input_file, args.output_file)
-        elif args.from_format == "kicad_sch" and args.to_format == "trace_json":
-            converter.kicad_sch_file_to_trace_json_file(args.input_file, args.output_file)
-        elif args.from_format == "trace_json" and args.to_format == "kicad_sch":
-            converter.trace_json_file_to_kicad_sch_file(args.input_file, args.output_file, existing_sch_path=args.existing_sch_path, symbol_paths=symbol_paths)
-        elif args.from_format == "kicad_sch" and args.to_format == "trace_sch":
-            converter.kicad_sch_file_to_trace_sch_file(args.input_file, args.output_file)
-        elif args.from_format == "trace_sch" and args.to_format == "kicad_sch":
-            converter.trace_sch_file_to_kicad_sch_file(args.input_file, args.output_file, existing_sch_path=args.existing_sch_path, symbol_paths=symbol_paths)
+        if args.batch_manifest:
+            jobs = read_batch_manifest(args.batch_manifest)
+            TraceConverter.convert_many(jobs, workers=args.workers, symbol_paths=symbol_paths)
+            print(f"Successfully converted {len(jobs)} file(s) from {args.batch_manifest}")
         else:
-            print(f"Error: Conversion from {args.from_format} to {args.to_format} is not supported.", file=sys.stderr)
-            sys.exit(1)
-        
-        print(f"Successfully converted {args.input_file} ({args.from_format}) to {args.output_file} ({args.to_format})")
+            if args.from_format != args.to_format and (args.from_format, args.to_format) not in _DISPATCH:
+                print(f"Error: Conversion from {args.from_format} to {args.to_format} is not supported.", file=sys.stderr)
+                sys.exit(1)
+            
+            TraceConverter.convert_file(args.input_file, args.output_file, args.from_format, args.to_format,
+                                        existing_sch_path=args.existing_sch_path, symbol_paths=symbol_paths,
+                                        pretty=args.pretty)
+            
+            print(f"Successfully converted {args.input_file} ({args.from_format}) to {args.output_file} ({args.to_format})")
     
     except NotImplementedError as e:
         print(f"Error: {e}", file=sys.stderr)
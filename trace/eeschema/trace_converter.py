@@ -24,136 +24,179 @@ Trace SCH Converter
 Converts parsed statement dictionaries back into .trace_sch file format.
 """
 
-from typing import List, Dict, Any, Union, Tuple
+import re
+from typing import List, Dict, Any, Optional, TextIO, Union, Tuple
+
+
+# Characters that force a string value to be quoted
+_NEEDS_QUOTE = re.compile(r"[ \t\n:=@{}(),]").search
+
+
+# Text of small non-negative integers: rotations, units, pages, colors
+_INT_STR_SMALL = tuple(str(i) for i in range(512))
+
+
+def _istr(value: Any) -> str:
+    """Format a value as an integer, reusing the text of small ones."""
+    i = int(value)
+    if 0 <= i < 512:
+        return _INT_STR_SMALL[i]
+    return str(i)
+
+
+def _fmt_num(value: Any) -> str:
+    """Format a number, writing whole floats as integers."""
+    value_type = type(value)
+    if value_type is int:
+        if 0 <= value < 512:
+            return _INT_STR_SMALL[value]
+        return str(value)
+    if value_type is float:
+        return str(int(value)) if value.is_integer() else repr(value)
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+# Formatted text of float coordinates. Schematics sit on a grid, so the same
+# handful of values repeats across thousands of points. Only floats are
+# cached since 1, 1.0 and True hash alike but format differently.
+_coord_text_cache: Dict[float, str] = {}
+_COORD_TEXT_CACHE_SIZE = 65536
+
+
+def _fmt_coord_num(value: Any) -> str:
+    """Format a coordinate component like _fmt_num, caching float results."""
+    value_type = type(value)
+    if value_type is float:
+        text = _coord_text_cache.get(value)
+        if text is None:
+            if len(_coord_text_cache) >= _COORD_TEXT_CACHE_SIZE:
+                _coord_text_cache.clear()
+            text = _coord_text_cache[value] = str(int(value)) if value.is_integer() else repr(value)
+        return text
+    if value_type is int:
+        return _INT_STR_SMALL[value] if 0 <= value < 512 else str(value)
+    return _fmt_num(value)
+
+
+# "%d,%d -> %d,%d ..." templates by point count, for all-integer point lists
+_INT_POINTS_FMT: Dict[int, str] = {}
+_INT_POINTS_FMT_MAX = 64
+
+
+def _format_int_points(points: List[Any]) -> Optional[str]:
+    """
+    Format a point list whose coordinates are all ints with one %-operation.
+
+    Returns None as soon as a non-int coordinate is seen, so the caller can
+    fall back to the general path.
+    """
+    flat = []
+    append = flat.append
+    for p in points:
+        x = p[0]
+        y = p[1]
+        if type(x) is not int or type(y) is not int:
+            return None
+        append(x)
+        append(y)
+    n = len(points)
+    if n > _INT_POINTS_FMT_MAX:
+        return " -> ".join(["%d,%d"] * n) % tuple(flat)
+    fmt = _INT_POINTS_FMT.get(n)
+    if fmt is None:
+        fmt = _INT_POINTS_FMT[n] = " -> ".join(["%d,%d"] * n)
+    return fmt % tuple(flat)
 
 
 class TraceConverter:
     """Converts statement dictionaries to trace_sch format."""
     
+    __slots__ = ("_buf",)
+    
     def __init__(self):
-        self.lines: List[str] = []
+        # Output fragments; every line ends with a separate "\n" fragment
+        self._buf: List[str] = []
     
-    def convert(self, statements: List[Dict[str, Any]]) -> str:
+    def convert(self, statements: List[Dict[str, Any]], out: Optional[TextIO] = None) -> Optional[str]:
         """
         Convert a list of statements to trace_sch format.
         
         Args:
             statements: List of statement dictionaries from parser
+            out: Optional text stream to write the output to instead of
+                 returning it, avoiding one full copy of the document
             
         Returns:
-            Formatted trace_sch content as string
+            Formatted trace_sch content as string, or None if out was given
         """
-        self.lines = []
+        self._buf = []
         
-        # Separate metadata statements from other statements
+        # Single pass over the statements. Body statements are written as they
+        # arrive; unknown types are skipped. Consecutive net statements are
+        # collected and written as one combined net line. Metadata statements
+        # are set aside and written in front of the body afterwards.
         # Note: kicad_ver, kicad_gen, kicad_gen_ver are no longer output - they are hardcoded in the converter
+        metadata_dispatch = self._METADATA_DISPATCH
+        dispatch = self._DISPATCH
         metadata_statements = []
-        other_statements = []
-        
+        net_names = []
         for stmt in statements:
             stmt_type = stmt.get("type")
-            if stmt_type in ("file_uid", "paper"):
+            if stmt_type == "net":
+                net_names.append(stmt["name"])
+                continue
+            if stmt_type in metadata_dispatch:
                 metadata_statements.append(stmt)
-            elif stmt_type in ("kicad_ver", "kicad_gen", "kicad_gen_ver"):
+                continue
+            if stmt_type in ("kicad_ver", "kicad_gen", "kicad_gen_ver"):
                 # Skip these - they are hardcoded in the converter
-                pass
-            else:
-                other_statements.append(stmt)
-        
-        # Group consecutive net statements
-        grouped_statements = []
-        i = 0
-        while i < len(other_statements):
-            if other_statements[i].get("type") == "net":
-                # Collect all consecutive net statements
-                net_group = []
-                while i < len(other_statements) and other_statements[i].get("type") == "net":
-                    net_group.append(other_statements[i])
-                    i += 1
-                # Add as a single grouped net statement
-                grouped_statements.append({"type": "net_group", "nets": net_group})
-            else:
-                grouped_statements.append(other_statements[i])
-                i += 1
+                continue
+            if net_names:
+                self._buf += ("net ", net_names[0] if len(net_names) == 1 else " ".join(net_names), "\n")
+                net_names = []
+            handler = dispatch.get(stmt_type)
+            if handler is not None:
+                handler(self, stmt)
+        if net_names:
+            self._buf += ("net ", net_names[0] if len(net_names) == 1 else " ".join(net_names), "\n")
         
         # Output metadata statements first
+        body = self._buf
+        self._buf = []
         for stmt in metadata_statements:
-            stmt_type = stmt.get("type")
-            if stmt_type == "file_uid":
-                self._convert_file_uid(stmt)
-            elif stmt_type == "paper":
-                self._convert_paper(stmt)
-        
-        # Output other statements
-        for stmt in grouped_statements:
-            stmt_type = stmt.get("type")
-            
-            if stmt_type == "comment":
-                self._convert_comment(stmt)
-            elif stmt_type == "component":
-                self._convert_component(stmt)
-            elif stmt_type == "net_group":
-                self._convert_net_group(stmt)
-            elif stmt_type == "net":
-                self._convert_net(stmt)
-            elif stmt_type == "wire":
-                self._convert_wire(stmt)
-            elif stmt_type == "cwire":
-                self._convert_cwire(stmt)
-            elif stmt_type == "cwiredef":
-                self._convert_cwiredef(stmt)
-            elif stmt_type == "label":
-                self._convert_label(stmt)
-            elif stmt_type == "glabel":
-                self._convert_glabel(stmt)
-            elif stmt_type == "hier":
-                self._convert_hier(stmt)
-            elif stmt_type == "sheet":
-                self._convert_sheet(stmt)
-            elif stmt_type == "text":
-                self._convert_text(stmt)
-            elif stmt_type == "junction":
-                self._convert_junction(stmt)
-            elif stmt_type == "noconnect":
-                self._convert_noconnect(stmt)
-            elif stmt_type == "bus":
-                self._convert_bus(stmt)
-            elif stmt_type == "polyline":
-                self._convert_polyline(stmt)
-            elif stmt_type == "rectangle":
-                self._convert_rectangle(stmt)
-            elif stmt_type == "arc":
-                self._convert_arc(stmt)
-            elif stmt_type == "bezier":
-                self._convert_bezier(stmt)
-            elif stmt_type == "circle":
-                self._convert_circle(stmt)
-            elif stmt_type == "text_box":
-                self._convert_text_box(stmt)
-            elif stmt_type == "bus_entry":
-                self._convert_bus_entry(stmt)
-            elif stmt_type == "instance_meta":
-                self._convert_instance_meta(stmt)
-            else:
-                # Unknown type, skip
-                continue
-        
-        return "\n".join(self.lines)
+            metadata_dispatch[stmt["type"]](self, stmt)
+        metadata_buf = self._buf
+        
+        # Drop the trailing newline so the output has none, as before
+        if body:
+            body.pop()
+        elif metadata_buf:
+            metadata_buf.pop()
+        
+        if out is not None:
+            out.writelines(metadata_buf)
+            out.writelines(body)
+            return None
+        metadata_buf += body
+        return "".join(metadata_buf)
     
     # Formatting helpers
     
     def _format_coord(self, coord: Union[Tuple[float, float], List[float]]) -> str:
         """Format a coordinate as 'x,y'."""
         x, y = coord[0], coord[1]
-        # Format as integer if whole number, otherwise float
-        if isinstance(x, float) and x.is_integer():
-            x = int(x)
-        if isinstance(y, float) and y.is_integer():
-            y = int(y)
-        return f"{x},{y}"
+        # Integer coordinates (e.g. parsed from trace_sch) format in one C call
+        if type(x) is int and type(y) is int:
+            return "%d,%d" % (x, y)
+        return _fmt_coord_num(x) + "," + _fmt_coord_num(y)
     
     def _escape_string(self, s: str) -> str:
         """Escape a string for output."""
+        # Most values contain neither character; return them untouched
+        if "\\" not in s and '"' not in s:
+            return s
         # Escape backslashes and quotes
         s = s.replace("\\", "\\\\")
         s = s.replace('"', '\\"')
@@ -163,14 +206,12 @@ class TraceConverter:
         """Format a value that could be string, number, or identifier."""
         if isinstance(value, str):
             # Check if it needs quoting (contains spaces or special chars)
-            if any(c in value for c in [' ', '\t', '\n', ':', '=', '@', '{', '}', '(', ')', ',']):
+            if _NEEDS_QUOTE(value):
                 return f'"{self._escape_string(value)}"'
             return value
         elif isinstance(value, (int, float)):
             # Format as integer if whole number
-            if isinstance(value, float) and value.is_integer():
-                return str(int(value))
-            return str(value)
+            return _fmt_num(value)
         else:
             return str(value)
     
@@ -179,24 +220,15 @@ class TraceConverter:
         if not props:
             return "{}"
         
-        prop_parts = []
-        for key, value in props.items():
-            escaped_key = self._escape_string(key)
-            escaped_value = self._escape_string(value)
-            prop_parts.append(f'prop "{escaped_key}":"{escaped_value}"')
-        
-        return "{ " + " , ".join(prop_parts) + " }"
+        escape = self._escape_string
+        return "{ " + " , ".join([f'prop "{escape(key)}":"{escape(value)}"' for key, value in props.items()]) + " }"
     
     def _format_pin_list(self, pins: Dict[Union[str, int], str]) -> str:
         """Format a pin list as '(pin=net,pin=net)'."""
         if not pins:
             return "()"
         
-        pin_parts = []
-        for pin_num, net_name in pins.items():
-            pin_parts.append(f"{pin_num}={net_name}")
-        
-        return "(" + ",".join(pin_parts) + ")"
+        return "(" + ",".join([f"{pin_num}={net_name}" for pin_num, net_name in pins.items()]) + ")"
     
     def _format_pinmap(self, pins: Dict[Union[str, int], Union[str, Dict[str, Any]]]) -> str:
         """Format a pinmap as '{ pin=net, pin=net @ x,y rot N }'."""
@@ -214,7 +246,7 @@ class TraceConverter:
                     coord_str = self._format_coord(coord)
                     pin_str = f"{pin_num}={net_name} @ {coord_str}"
                     if rot is not None:
-                        pin_str += f" rot {int(rot)}"
+                        pin_str += " rot " + _istr(rot)
                     pin_parts.append(pin_str)
                 else:
                     # Fallback to simple format if no coordinates
@@ -230,447 +262,318 @@ class TraceConverter:
         if not points:
             return ""
         
-        coord_strs = [self._format_coord(p) for p in points]
-        return " -> ".join(coord_strs)
+        # Grid-aligned integer wires take a single-format fast path
+        if type(points[0][0]) is int:
+            text = _format_int_points(points)
+            if text is not None:
+                return text
+        
+        # Inlined _format_coord; this is the hottest path for wire-heavy files
+        return " -> ".join([_fmt_coord_num(p[0]) + "," + _fmt_coord_num(p[1]) for p in points])
     
     # Statement converters
+    #
+    # Each converter appends its line as fragments to self._buf, with the
+    # separating spaces folded into the constant fragments, and ends the
+    # line with a "\n" fragment.
     
     def _convert_comment(self, stmt: Dict[str, Any]):
         """Convert a comment statement."""
         text = stmt.get("text", "")
         # Preserve the comment text, adding # if not present
         if text.startswith("#"):
-            self.lines.append(text)
+            self._buf += (text, "\n")
         else:
-            self.lines.append(f"# {text}")
+            self._buf += (f"# {text}", "\n")
     
     def _convert_component(self, stmt: Dict[str, Any]):
         """Convert a component statement."""
-        parts = ["comp"]
-        parts.append(stmt["ref"])
-        parts.append(stmt["symbol"])
+        buf = self._buf
+        buf += ("comp ", stmt["ref"], " ", stmt["symbol"])
         
         # Optional value
         if "value" in stmt:
-            parts.append(self._format_string_value(stmt["value"]))
+            buf += (" ", self._format_string_value(stmt["value"]))
         
         # Optional @ coord
         if "at" in stmt:
-            parts.append("@")
-            parts.append(self._format_coord(stmt["at"]))
+            buf += (" @ ", self._format_coord(stmt["at"]))
         
         # Optional rot
         if "rot" in stmt:
-            parts.append("rot")
-            parts.append(str(int(stmt["rot"])))
+            buf += (" rot ", _istr(stmt["rot"]))
         
         # Optional unit (only output if not 1, the default)
         unit = stmt.get("unit", 1)
         if unit != 1:
-            parts.append("unit")
-            parts.append(str(int(unit)))
+            buf += (" unit ", _istr(unit))
         
         # Optional body_style (only output if not 1, the default)
         body_style = stmt.get("body_style", 1)
         if body_style != 1:
-            parts.append("body_style")
-            parts.append(str(int(body_style)))
+            buf += (" body_style ", _istr(body_style))
         
         # Optional props
         if "props" in stmt:
-            parts.append("props")
-            parts.append(self._format_prop_list(stmt["props"]))
+            buf += (" props ", self._format_prop_list(stmt["props"]))
         
-        # Required pins
-        parts.append("pins")
-        parts.append(self._format_pin_list(stmt["pins"]))
-        
-        # Required uid
-        parts.append("uid")
-        parts.append(stmt["uid"])
-        
-        self.lines.append(" ".join(parts))
+        # Required pins and uid
+        buf += (" pins ", self._format_pin_list(stmt["pins"]), " uid ", stmt["uid"], "\n")
     
     def _convert_net(self, stmt: Dict[str, Any]):
         """Convert a net statement."""
-        self.lines.append(f"net {stmt['name']}")
+        self._buf += (f"net {stmt['name']}", "\n")
     
     def _convert_net_group(self, stmt: Dict[str, Any]):
         """Convert a grouped net statement (multiple nets combined)."""
         nets = stmt.get("nets", [])
-        if nets:
-            net_names = [net_stmt["name"] for net_stmt in nets]
-            self.lines.append(f"net {' '.join(net_names)}")
+        if len(nets) == 1:
+            self._buf += ("net ", nets[0]["name"], "\n")
+        elif nets:
+            self._buf += ("net ", " ".join([net_stmt["name"] for net_stmt in nets]), "\n")
     
     def _convert_wire(self, stmt: Dict[str, Any]):
         """Convert a wire statement."""
-        parts = ["wire"]
-        parts.append(self._format_wire_points(stmt["points"]))
-        parts.append("uid")
-        parts.append(stmt["uid"])
-        self.lines.append(" ".join(parts))
+        self._buf += ("wire ", self._format_wire_points(stmt["points"]), " uid ", stmt["uid"], "\n")
     
     def _format_endpoint(self, endpoint: Dict[str, Any]) -> str:
         """Format a cwire endpoint (pin_ref or junction_ref)."""
-        endpoint_type = endpoint.get("type")
-        
+        get = endpoint.get
+        endpoint_type = get("type")
         if endpoint_type == "pin":
-            ref = endpoint.get("ref", "")
-            pin = endpoint.get("pin", "")
-            return f"{ref}.{pin}"
-        elif endpoint_type == "junction":
-            junction_id = endpoint.get("id", "JUNC?")
-            return junction_id
-        else:
-            return "?"
+            return f"{get('ref', '')}.{get('pin', '')}"
+        if endpoint_type == "junction":
+            return get("id", "JUNC?")
+        return "?"
     
     def _convert_cwire(self, stmt: Dict[str, Any]):
         """Convert a cwire statement.
         
         Format: cwire CW_REF endpoint -> endpoint [net NET_NAME]
         """
-        parts = ["cwire"]
-        
-        # cwire reference (CW1, CW2, etc.)
-        cwire_ref = stmt.get("ref", "CW?")
-        parts.append(cwire_ref)
-        
-        # From endpoint
-        from_endpoint = stmt.get("from", {})
-        parts.append(self._format_endpoint(from_endpoint))
-        
-        # Arrow
-        parts.append("->")
-        
-        # To endpoint
-        to_endpoint = stmt.get("to", {})
-        parts.append(self._format_endpoint(to_endpoint))
+        buf = self._buf
+        # cwire reference (CW1, CW2, etc.), then from -> to endpoints
+        buf += ("cwire ", stmt.get("ref", "CW?"),
+                " ", self._format_endpoint(stmt.get("from", {})),
+                " -> ", self._format_endpoint(stmt.get("to", {})))
         
         # Optional net clause
         if "net" in stmt:
-            parts.append("net")
-            parts.append(stmt["net"])
+            buf += (" net ", stmt["net"])
         
-        self.lines.append(" ".join(parts))
+        buf.append("\n")
     
     def _convert_cwiredef(self, stmt: Dict[str, Any]):
         """Convert a cwiredef statement.
         
         Format: cwiredef CW_REF x1,y1 -> x2,y2 -> x3,y3
         """
-        parts = ["cwiredef"]
-        
-        # cwire reference (CW1, CW2, etc.)
-        cwire_ref = stmt.get("ref", "CW?")
-        parts.append(cwire_ref)
-        
-        # Wire points
-        points = stmt.get("points", [])
-        parts.append(self._format_wire_points(points))
-        
-        self.lines.append(" ".join(parts))
+        # cwire reference (CW1, CW2, etc.), then the wire points
+        self._buf += ("cwiredef ", stmt.get("ref", "CW?"),
+                      " ", self._format_wire_points(stmt.get("points", [])), "\n")
     
     def _convert_label(self, stmt: Dict[str, Any]):
         """Convert a label statement."""
-        parts = ["label"]
-        parts.append(stmt["name"])
-        parts.append("@")
-        parts.append(self._format_coord(stmt["at"]))
-        self.lines.append(" ".join(parts))
+        self._buf += ("label ", stmt["name"], " @ ", self._format_coord(stmt["at"]), "\n")
     
     def _convert_glabel(self, stmt: Dict[str, Any]):
         """Convert a glabel statement."""
-        parts = ["glabel"]
-        parts.append(stmt["name"])
-        
+        buf = self._buf
         # Required @ coord
-        parts.append("@")
-        parts.append(self._format_coord(stmt["at"]))
+        buf += ("glabel ", stmt["name"], " @ ", self._format_coord(stmt["at"]))
         
         # Optional rot
         if "rot" in stmt:
-            parts.append("rot")
-            parts.append(str(int(stmt["rot"])))
+            buf += (" rot ", _istr(stmt["rot"]))
         
         # Optional shape
         if "shape" in stmt:
-            parts.append("shape")
-            parts.append(stmt["shape"])
+            buf += (" shape ", stmt["shape"])
         
         # Optional props
         if "props" in stmt:
-            parts.append(self._format_prop_list(stmt["props"]))
+            buf += (" ", self._format_prop_list(stmt["props"]))
         
-        self.lines.append(" ".join(parts))
+        buf.append("\n")
     
     def _convert_hier(self, stmt: Dict[str, Any]):
         """Convert a hier statement."""
-        parts = ["hier"]
-        parts.append(stmt["name"])
-        parts.append("@")
-        parts.append(self._format_coord(stmt["at"]))
+        buf = self._buf
+        buf += ("hier ", stmt["name"], " @ ", self._format_coord(stmt["at"]))
         
         # Optional rot
         if "rot" in stmt:
-            parts.append("rot")
-            parts.append(str(int(stmt["rot"])))
+            buf += (" rot ", _istr(stmt["rot"]))
         
         # Optional shape
         if "shape" in stmt:
-            parts.append("shape")
-            parts.append(stmt["shape"])
+            buf += (" shape ", stmt["shape"])
         
         # Optional props
         if "props" in stmt:
-            parts.append(self._format_prop_list(stmt["props"]))
+            buf += (" ", self._format_prop_list(stmt["props"]))
         
-        self.lines.append(" ".join(parts))
+        buf.append("\n")
     
     def _convert_sheet(self, stmt: Dict[str, Any]):
         """Convert a sheet statement."""
-        parts = ["sheet"]
-        parts.append(stmt["name"])
-        parts.append("file")
+        buf = self._buf
+        buf += ("sheet ", stmt["name"], " file ")
         
         # File can be string or ident
         file_value = stmt["file"]
         if isinstance(file_value, str):
-            # Check if it needs quoting
-            if any(c in file_value for c in [' ', '\t', '\n', ':', '=', '@', '{', '}', '(', ')', ',']):
-                parts.append(f'"{self._escape_string(file_value)}"')
-            else:
-                parts.append(file_value)
+            buf.append(self._format_string_value(file_value))
         else:
-            parts.append(str(file_value))
+            buf.append(str(file_value))
         
         # Optional @ coord
         if "at" in stmt:
-            parts.append("@")
-            parts.append(self._format_coord(stmt["at"]))
+            buf += (" @ ", self._format_coord(stmt["at"]))
         
         # Optional rot
         if "rot" in stmt:
-            parts.append("rot")
-            parts.append(str(int(stmt["rot"])))
+            buf += (" rot ", _istr(stmt["rot"]))
         
         # Optional size
         if "size" in stmt:
-            parts.append("size")
-            parts.append(self._format_coord(stmt["size"]))
+            buf += (" size ", self._format_coord(stmt["size"]))
         
         # Optional props
         if "props" in stmt:
-            parts.append(self._format_prop_list(stmt["props"]))
+            buf += (" ", self._format_prop_list(stmt["props"]))
         
         # Optional ins
         if "ins" in stmt:
-            parts.append("ins")
-            parts.append(self._format_pinmap(stmt["ins"]))
+            buf += (" ins ", self._format_pinmap(stmt["ins"]))
         
         # Optional outs
         if "outs" in stmt:
-            parts.append("outs")
-            parts.append(self._format_pinmap(stmt["outs"]))
+            buf += (" outs ", self._format_pinmap(stmt["outs"]))
         
         # Required uid
-        parts.append("uid")
-        parts.append(stmt["uid"])
-        
-        self.lines.append(" ".join(parts))
+        buf += (" uid ", stmt["uid"], "\n")
     
     def _convert_text(self, stmt: Dict[str, Any]):
         """Convert a text statement."""
-        parts = ["text"]
-        parts.append(f'"{self._escape_string(stmt["string"])}"')
+        buf = self._buf
+        buf.append(f'text "{self._escape_string(stmt["string"])}"')
         
         # Optional @ coord
         if "at" in stmt:
-            parts.append("@")
-            parts.append(self._format_coord(stmt["at"]))
+            buf += (" @ ", self._format_coord(stmt["at"]))
         
         # Optional props
         if "props" in stmt:
-            parts.append(self._format_prop_list(stmt["props"]))
+            buf += (" ", self._format_prop_list(stmt["props"]))
         
-        self.lines.append(" ".join(parts))
+        buf.append("\n")
     
     def _convert_junction(self, stmt: Dict[str, Any]):
         """Convert a junction statement.
         
         Format: junction [JUNC_ID] @ x,y uid UUID
         """
-        parts = ["junction"]
+        buf = self._buf
+        buf.append("junction")
         
         # Optional junction ID (e.g., JUNC1)
         if "id" in stmt:
-            parts.append(stmt["id"])
+            buf += (" ", stmt["id"])
         
-        parts.append("@")
-        parts.append(self._format_coord(stmt["at"]))
-        parts.append("uid")
-        parts.append(stmt["uid"])
-        self.lines.append(" ".join(parts))
+        buf += (" @ ", self._format_coord(stmt["at"]), " uid ", stmt["uid"], "\n")
     
     def _convert_noconnect(self, stmt: Dict[str, Any]):
         """Convert a noconnect statement."""
-        parts = ["noconnect"]
-        parts.append("@")
-        parts.append(self._format_coord(stmt["at"]))
-        parts.append("uid")
-        parts.append(stmt["uid"])
-        self.lines.append(" ".join(parts))
+        self._buf += ("noconnect @ ", self._format_coord(stmt["at"]), " uid ", stmt["uid"], "\n")
     
     def _convert_bus(self, stmt: Dict[str, Any]):
         """Convert a bus statement."""
-        parts = ["bus"]
-        parts.append(self._format_wire_points(stmt["points"]))
-        parts.append("uid")
-        parts.append(stmt["uid"])
-        
-        self.lines.append(" ".join(parts))
+        self._buf += ("bus ", self._format_wire_points(stmt["points"]), " uid ", stmt["uid"], "\n")
     
     def _convert_polyline(self, stmt: Dict[str, Any]):
         """Convert a polyline statement."""
-        parts = ["polyline"]
-        parts.append(self._format_wire_points(stmt["points"]))
-        parts.append("uid")
-        parts.append(stmt["uid"])
-        
-        self.lines.append(" ".join(parts))
+        self._buf += ("polyline ", self._format_wire_points(stmt["points"]), " uid ", stmt["uid"], "\n")
     
     def _format_stroke(self, stroke: Dict[str, Any]) -> str:
         """Format a stroke as 'stroke width N type "TYPE"'."""
-        width = stroke.get("width", 0)
-        if isinstance(width, float) and width.is_integer():
-            width = int(width)
+        width = _fmt_num(stroke.get("width", 0))
         stroke_type = stroke.get("type", "default")
         return f'stroke width {width} type "{self._escape_string(stroke_type)}"'
     
     def _format_fill(self, fill: Dict[str, Any]) -> str:
         """Format a fill as 'fill type "TYPE" [color R G B A]'."""
         fill_type = fill.get("type", "none")
-        parts = [f'fill type "{self._escape_string(fill_type)}"']
-        if "color" in fill:
-            color = fill["color"]
-            if len(color) >= 4:
-                r = int(color[0]) if isinstance(color[0], float) and color[0].is_integer() else color[0]
-                g = int(color[1]) if isinstance(color[1], float) and color[1].is_integer() else color[1]
-                b = int(color[2]) if isinstance(color[2], float) and color[2].is_integer() else color[2]
-                a = int(color[3]) if isinstance(color[3], float) and color[3].is_integer() else color[3]
-                parts.append(f"color {r} {g} {b} {a}")
-        return " ".join(parts)
+        text = f'fill type "{self._escape_string(fill_type)}"'
+        color = fill.get("color")
+        if color is not None and len(color) >= 4:
+            text += " color " + " ".join([_fmt_num(c) for c in color[:4]])
+        return text
     
     def _convert_rectangle(self, stmt: Dict[str, Any]):
         """Convert a rectangle statement."""
-        parts = ["rectangle"]
-        parts.append("start")
-        parts.append(self._format_coord(stmt["start"]))
-        parts.append("end")
-        parts.append(self._format_coord(stmt["end"]))
-        parts.append(self._format_stroke(stmt["stroke"]))
-        parts.append(self._format_fill(stmt["fill"]))
-        parts.append("uid")
-        parts.append(stmt["uid"])
-        
-        self.lines.append(" ".join(parts))
+        self._buf += ("rectangle start ", self._format_coord(stmt["start"]),
+                      " end ", self._format_coord(stmt["end"]),
+                      " ", self._format_stroke(stmt["stroke"]),
+                      " ", self._format_fill(stmt["fill"]),
+                      " uid ", stmt["uid"], "\n")
     
     def _convert_arc(self, stmt: Dict[str, Any]):
         """Convert an arc statement."""
-        parts = ["arc"]
-        parts.append("start")
-        parts.append(self._format_coord(stmt["start"]))
-        parts.append("mid")
-        parts.append(self._format_coord(stmt["mid"]))
-        parts.append("end")
-        parts.append(self._format_coord(stmt["end"]))
-        parts.append(self._format_stroke(stmt["stroke"]))
-        parts.append(self._format_fill(stmt["fill"]))
-        parts.append("uid")
-        parts.append(stmt["uid"])
-        
-        self.lines.append(" ".join(parts))
+        self._buf += ("arc start ", self._format_coord(stmt["start"]),
+                      " mid ", self._format_coord(stmt["mid"]),
+                      " end ", self._format_coord(stmt["end"]),
+                      " ", self._format_stroke(stmt["stroke"]),
+                      " ", self._format_fill(stmt["fill"]),
+                      " uid ", stmt["uid"], "\n")
     
     def _convert_bezier(self, stmt: Dict[str, Any]):
         """Convert a bezier statement."""
-        parts = ["bezier"]
-        parts.append(self._format_wire_points(stmt["points"]))
-        parts.append(self._format_stroke(stmt["stroke"]))
-        parts.append(self._format_fill(stmt["fill"]))
-        parts.append("uid")
-        parts.append(stmt["uid"])
-        
-        self.lines.append(" ".join(parts))
+        self._buf += ("bezier ", self._format_wire_points(stmt["points"]),
+                      " ", self._format_stroke(stmt["stroke"]),
+                      " ", self._format_fill(stmt["fill"]),
+                      " uid ", stmt["uid"], "\n")
     
     def _convert_circle(self, stmt: Dict[str, Any]):
         """Convert a circle statement."""
-        parts = ["circle"]
-        parts.append("center")
-        parts.append(self._format_coord(stmt["center"]))
-        parts.append("radius")
-        radius = stmt["radius"]
-        if isinstance(radius, float) and radius.is_integer():
-            radius = int(radius)
-        parts.append(str(radius))
-        parts.append(self._format_stroke(stmt["stroke"]))
-        parts.append(self._format_fill(stmt["fill"]))
-        parts.append("uid")
-        parts.append(stmt["uid"])
-        
-        self.lines.append(" ".join(parts))
+        self._buf += ("circle center ", self._format_coord(stmt["center"]),
+                      " radius ", _fmt_num(stmt["radius"]),
+                      " ", self._format_stroke(stmt["stroke"]),
+                      " ", self._format_fill(stmt["fill"]),
+                      " uid ", stmt["uid"], "\n")
     
     def _convert_text_box(self, stmt: Dict[str, Any]):
         """Convert a text_box statement."""
-        parts = ["text_box"]
-        parts.append(f'"{self._escape_string(stmt["text"])}"')
-        parts.append("@")
-        parts.append(self._format_coord(stmt["at"]))
+        buf = self._buf
+        buf += (f'text_box "{self._escape_string(stmt["text"])}"',
+                " @ ", self._format_coord(stmt["at"]))
         
         # Optional rot
         if "rot" in stmt:
-            parts.append("rot")
-            parts.append(str(int(stmt["rot"])))
+            buf += (" rot ", _istr(stmt["rot"]))
         
         # Required size
-        parts.append("size")
-        parts.append(self._format_coord(stmt["size"]))
+        buf += (" size ", self._format_coord(stmt["size"]))
         
         # Optional margins
         if "margins" in stmt:
-            parts.append("margins")
-            margins = stmt["margins"]
-            margin_strs = []
-            for m in margins:
-                if isinstance(m, float) and m.is_integer():
-                    margin_strs.append(str(int(m)))
-                else:
-                    margin_strs.append(str(m))
-            parts.append(",".join(margin_strs))
+            buf += (" margins ", ",".join([_fmt_num(m) for m in stmt["margins"]]))
         
-        parts.append(self._format_stroke(stmt["stroke"]))
-        parts.append(self._format_fill(stmt["fill"]))
+        buf += (" ", self._format_stroke(stmt["stroke"]),
+                " ", self._format_fill(stmt["fill"]))
         
         # Optional effects
         if "effects" in stmt:
-            parts.append("effects")
-            parts.append(self._format_prop_list(stmt["effects"]))
+            buf += (" effects ", self._format_prop_list(stmt["effects"]))
         
-        parts.append("uid")
-        parts.append(stmt["uid"])
-        
-        self.lines.append(" ".join(parts))
+        buf += (" uid ", stmt["uid"], "\n")
     
     def _convert_bus_entry(self, stmt: Dict[str, Any]):
         """Convert a bus_entry statement."""
-        parts = ["bus_entry"]
-        parts.append("@")
-        parts.append(self._format_coord(stmt["at"]))
-        parts.append("size")
-        parts.append(self._format_coord(stmt["size"]))
-        parts.append(self._format_stroke(stmt["stroke"]))
-        parts.append("uid")
-        parts.append(stmt["uid"])
-        
-        self.lines.append(" ".join(parts))
+        self._buf += ("bus_entry @ ", self._format_coord(stmt["at"]),
+                      " size ", self._format_coord(stmt["size"]),
+                      " ", self._format_stroke(stmt["stroke"]),
+                      " uid ", stmt["uid"], "\n")
     
     # Note: _convert_kicad_ver, _convert_kicad_gen, _convert_kicad_gen_ver
     # have been removed - these metadata values are now hardcoded in the converter
@@ -678,43 +581,72 @@ class TraceConverter:
     def _convert_file_uid(self, stmt: Dict[str, Any]):
         """Convert a file_uid statement."""
         value = stmt.get("value", "")
-        self.lines.append(f"file_uid {value}")
+        self._buf += (f"file_uid {value}", "\n")
     
     def _convert_paper(self, stmt: Dict[str, Any]):
         """Convert a paper statement."""
         value = stmt.get("value", "")
-        self.lines.append(f'paper "{self._escape_string(value)}"')
+        self._buf += (f'paper "{self._escape_string(value)}"', "\n")
     
     def _convert_instance_meta(self, stmt: Dict[str, Any]):
         """Convert an instance_meta statement."""
-        parts = ["inst"]
-        parts.append("project")
-        parts.append(f'"{self._escape_string(stmt["project"])}"')
-        parts.append("path")
-        parts.append(f'"{self._escape_string(stmt["path"])}"')
+        buf = self._buf
+        buf += ('inst project "', self._escape_string(stmt["project"]),
+                '" path "', self._escape_string(stmt["path"]), '"')
         
         # Optional page
         if "page" in stmt:
-            parts.append("page")
-            parts.append(str(int(stmt["page"])))
-        
-        self.lines.append(" ".join(parts))
+            buf += (" page ", _istr(stmt["page"]))
+        
+        buf.append("\n")
+    
+    # Statement type -> converter, looked up once per statement by convert()
+    _METADATA_DISPATCH = {
+        "file_uid": _convert_file_uid,
+        "paper": _convert_paper,
+    }
+    
+    _DISPATCH = {
+        "comment": _convert_comment,
+        "component": _convert_component,
+        "net_group": _convert_net_group,
+        "wire": _convert_wire,
+        "cwire": _convert_cwire,
+        "cwiredef": _convert_cwiredef,
+        "label": _convert_label,
+        "glabel": _convert_glabel,
+        "hier": _convert_hier,
+        "sheet": _convert_sheet,
+        "text": _convert_text,
+        "junction": _convert_junction,
+        "noconnect": _convert_noconnect,
+        "bus": _convert_bus,
+        "polyline": _convert_polyline,
+        "rectangle": _convert_rectangle,
+        "arc": _convert_arc,
+        "bezier": _convert_bezier,
+        "circle": _convert_circle,
+        "text_box": _convert_text_box,
+        "bus_entry": _convert_bus_entry,
+        "instance_meta": _convert_instance_meta,
+    }
 
 
 # Public API
 
-def convert_to_trace_sch(statements: List[Dict[str, Any]]) -> str:
+def convert_to_trace_sch(statements: List[Dict[str, Any]], out: Optional[TextIO] = None) -> Optional[str]:
     """
     Convert a list of statement dictionaries to trace_sch format.
     
     Args:
         statements: List of statement dictionaries from parser
+        out: Optional text stream to write the output to instead of returning it
         
     Returns:
-        Formatted trace_sch content as string
+        Formatted trace_sch content as string, or None if out was given
     """
     converter = TraceConverter()
-    return converter.convert(statements)
+    return converter.convert(statements, out)
 
 
 # Testing
@@ -731,6 +663,5 @@ if __name__ == "__main__":
     with open(filename, "r") as file:
         statements = json.load(file)
     
-    trace_sch_content = convert_to_trace_sch(statements)
-    with open("output.trace_sch", "w") as file:
-        file.write(trace_sch_content)
+    with open("output.trace_sch", "w", buffering=1 << 20) as file:
+        convert_to_trace_sch(statements, out=file)
@@ -28,11 +28,13 @@ Loads symbol definitions from KiCad library files and generates proper S-express
 import json
 import math
 import os
+import re
 import uuid
 import copy
-from typing import List, Dict, Any, Optional, Tuple, Union, Set
+from typing import List, Dict, Any, Optional, Tuple, Union, Set, TextIO
 import logging
 import sys
+from sys import intern
 
 # Industry-standard console-only logging for CLI tools
 # Robust, zero permission issues, cross-platform compatible
@@ -52,29 +54,48 @@ logger = logging.getLogger(__name__)
 
 # No external dependencies - using custom fast parser
 
-# Import net router for intelligent routing
-import sys
-import os
+# Net router for intelligent routing, imported on first use since only
+# schematics with cwires that need autorouting require it
+_route_cwires = None
 
-# Handle both module import and direct script execution
-try:
-    from .net_router import route_cwires
-except (ImportError, ValueError):
-    # Fallback for direct script execution - add current directory to path
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    if script_dir not in sys.path:
-        sys.path.insert(0, script_dir)
-    try:
-        from net_router import route_cwires
-    except ImportError:
-        logger.error("Error: net_router module not found")
-        raise
+
+def _get_route_cwires():
+    """Return net_router.route_cwires, importing it on first call."""
+    global _route_cwires
+    if _route_cwires is None:
+        # Handle both module import and direct script execution
+        try:
+            from .net_router import route_cwires
+        except (ImportError, ValueError):
+            # Fallback for direct script execution - add current directory to path
+            script_dir = os.path.dirname(os.path.abspath(__file__))
+            if script_dir not in sys.path:
+                sys.path.insert(0, script_dir)
+            try:
+                from net_router import route_cwires
+            except ImportError:
+                logger.error("Error: net_router module not found")
+                raise
+        _route_cwires = route_cwires
+    return _route_cwires
 
 
 # =============================================================================
 # S-Expression Parser (reused from sexp_to_trace_json.py)
 # =============================================================================
 
+# First characters of atoms that may be numbers. Non-ASCII digits are
+# rare enough to be checked with str.isdigit() only when needed
+_NUMBER_START = frozenset('0123456789.-')
+
+
+# Python's int() syntax for ASCII text, used to tell numbers from
+# other atoms (uuids, hyphenated names, ...) without letting ValueError do it
+_DIGITS = r'[0-9](?:_?[0-9])*'
+_TRAILING_SPACE = r'[ \t\n\r\x0b\x0c]*\Z'
+_INT_MATCH = re.compile(r'[+-]?' + _DIGITS + _TRAILING_SPACE).match
+
+
 def from_s_atom(obj):
     """Convert S-expression atom to Python value."""
     if not isinstance(obj, str):
@@ -84,9 +105,17 @@ def from_s_atom(obj):
         return obj
     
     first = obj[0]
-    if first.isdigit() or first == '.' or first == '-':
+    if first in _NUMBER_START or (first > '\x7f' and first.isdigit()):
+        if '.' in obj:
+            try:
+                return float(obj)
+            except ValueError:
+                return obj
+        if not obj.isdecimal() and obj.isascii() and not _INT_MATCH(obj):
+            # Unquoted uuids and other non-numbers
+            return obj
         try:
-            return int(obj) if '.' not in obj else float(obj)
+            return int(obj)
         except ValueError:
             return obj
     elif first in '\'"':
@@ -103,129 +132,87 @@ def from_s_data(obj):
         return from_s_atom(obj)
 
 
+# Tokens of the S-expression syntax: parentheses, quoted strings (which may
+# run unterminated to the end of the text) and unquoted atoms, which extend
+# up to whitespace or ')'. findall() skips the whitespace between tokens.
+_TOKENIZE = re.compile(r'[()]|"(?:[^"\\]|\\.)*(?:"|\\?\Z)|[^\s()"][^\s)]*', re.DOTALL).findall
+
+# Escape sequences recognized inside quoted strings
+_STRING_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', '\\': '\\', '"': '"'}
+
+# A backslash and the character it escapes (empty for a trailing backslash)
+_ESCAPE_SEQUENCE = re.compile(r'\\(.?)', re.DOTALL).sub
+
+
+def _decode_escape(match) -> str:
+    """Decode one escape sequence; unknown ones are kept literally."""
+    char = match.group(1)
+    decoded = _STRING_ESCAPES.get(char)
+    return decoded if decoded is not None else '\\' + char
+
+
+def _unquote(token: str) -> str:
+    """Return the text of a quoted string token with its escapes decoded."""
+    if len(token) > 1 and token[-1] == '"':
+        body = token[1:-1]
+        # An odd run of backslashes before the last quote escapes it, which
+        # means the string was left unterminated at the end of the text
+        if body[-1:] == '\\' and (len(body) - len(body.rstrip('\\'))) % 2:
+            body = token[1:]
+    else:
+        body = token[1:]
+    if '\\' in body:
+        return _ESCAPE_SEQUENCE(_decode_escape, body)
+    return body
+
+
 class SexpParser:
-    """Fast custom recursive S-expression parser."""
+    """Fast S-expression parser built on a regex tokenizer."""
     
     def __init__(self, text: str):
         self.text = text
-        self.pos = 0
-        self.length = len(text)
-    
-    def skip_whitespace(self):
-        """Skip whitespace characters."""
-        while self.pos < self.length and self.text[self.pos].isspace():
-            self.pos += 1
     
     def parse(self) -> Any:
-        """Parse the S-expression string."""
-        self.skip_whitespace()
-        if self.pos >= self.length:
-            return None
-        
-        if self.text[self.pos] == '(':
-            return self.parse_list()
-        else:
-            return self.parse_atom()
-    
-    def parse_list(self) -> List:
-        """Parse a list (parenthesized expression)."""
-        self.pos += 1  # Skip '('
-        result = []
-        
-        while True:
-            self.skip_whitespace()
-            
-            if self.pos >= self.length:
-                raise ValueError("Unclosed parenthesis")
-            
-            if self.text[self.pos] == ')':
-                self.pos += 1
-                break
-            
-            if self.text[self.pos] == '(':
-                result.append(self.parse_list())
+        """Parse the first S-expression in the text."""
+        # Lists are built iteratively: current is the innermost open list
+        # and stack holds the lists enclosing it
+        stack = []
+        current = None
+        
+        for token in _TOKENIZE(self.text):
+            char = token[0]
+            if char == '(':
+                nested = []
+                if current is not None:
+                    current.append(nested)
+                    stack.append(current)
+                current = nested
+            elif char == ')':
+                if current is None:
+                    # Stray closing paren where an expression was expected
+                    return ''
+                # Intern the keyword heading the list so repeated keywords
+                # share one string object and compare by identity
+                if current and type(current[0]) is str:
+                    current[0] = intern(current[0])
+                if not stack:
+                    return current
+                current = stack.pop()
             else:
-                result.append(self.parse_atom())
-        
-        return result
-    
-    def parse_atom(self) -> Union[str, int, float]:
-        """Parse an atom (string, number, or identifier)."""
-        self.skip_whitespace()
-        
-        if self.pos >= self.length:
-            return ""
-        
-        # Handle quoted strings
-        if self.text[self.pos] == '"':
-            return self.parse_quoted_string()
-        
-        # Handle numbers and identifiers - read until whitespace or closing paren
-        start = self.pos
-        
-        while self.pos < self.length:
-            char = self.text[self.pos]
-            
-            # Stop on whitespace or closing paren
-            if char.isspace() or char == ')':
-                break
-            
-            self.pos += 1
-        
-        atom = self.text[start:self.pos]
-        return from_s_atom(atom)
-    
-    def parse_quoted_string(self) -> str:
-        """Parse a quoted string with escape sequences."""
-        self.pos += 1  # Skip opening quote
-        result = []
-        
-        while self.pos < self.length:
-            char = self.text[self.pos]
-            
-            if char == '"':
-                # Check if it's escaped
-                if self.pos > 0 and self.text[self.pos - 1] == '\\':
-                    result.append('"')
-                    self.pos += 1
-                    continue
-                else:
-                    self.pos += 1
-                    break
-            
-            if char == '\\' and self.pos + 1 < self.length:
-                next_char = self.text[self.pos + 1]
-                if next_char == 'n':
-                    result.append('\n')
-                    self.pos += 2
-                    continue
-                elif next_char == 't':
-                    result.append('\t')
-                    self.pos += 2
-                    continue
-                elif next_char == 'r':
-                    result.append('\r')
-                    self.pos += 2
-                    continue
-                elif next_char == '\\':
-                    result.append('\\')
-                    self.pos += 2
-                    continue
-                elif next_char == '"':
-                    result.append('"')
-                    self.pos += 2
-                    continue
-            
-            result.append(char)
-            self.pos += 1
+                value = _unquote(token) if char == '"' else from_s_atom(token)
+                if current is None:
+                    return value
+                current.append(value)
         
-        return ''.join(result)
+        if current is not None:
+            raise ValueError("Unclosed parenthesis")
+        return None
 
 
 def parse_sexp(string: str) -> Any:
     """
     Parse a S-expression string into Python objects.
-    Uses a fast custom recursive parser.
+    Uses a fast regex-tokenizing parser.
     """
     parser = SexpParser(string)
     result = parser.parse()
@@ -240,7 +227,7 @@ def parse_sexp(string: str) -> Any:
 
 # Fields whose values should be quoted in S-expressions
 # These are the keywords where the value immediately following should be quoted
-QUOTED_VALUE_FIELDS = {'name', 'number', 'property', 'symbol', 'uuid', 'label', 'global_label', 'hierarchical_label', 'path', 'generator', 'paper', 'lib_id', 'lib_name', 'project', 'reference', 'page'}
+QUOTED_VALUE_FIELDS = frozenset({'name', 'number', 'property', 'symbol', 'uuid', 'label', 'global_label', 'hierarchical_label', 'path', 'generator', 'paper', 'lib_id', 'lib_name', 'project', 'reference', 'page'})
 
 
 def escape_string(value: str) -> str:
@@ -256,13 +243,218 @@ def escape_string(value: str) -> str:
     Returns:
         Cleaned string with internal quotes removed
     """
-    # Remove all quotes from the string content
-    # Also remove escaped quotes (\" becomes empty)
-    # Remove backslashes that were used for escaping quotes
+    # Remove all quotes and backslashes from the string content; escaped
+    # quotes (\") disappear with them
     if not isinstance(value, str):
         return value
-    cleaned = value.replace('\\"', '').replace('"', '').replace('\\', '')
-    return cleaned
+    # Most values (references, net names, uuids) contain neither quotes nor
+    # backslashes and are returned as they are
+    if '"' not in value and '\\' not in value:
+        return value
+    return value.replace('"', '').replace('\\', '')
+
+
+# Electrical types that mark a (pin ...) as a library symbol pin, whose type
+# token is written unquoted
+_LIBRARY_PIN_TYPES = frozenset({
+    'line', 'inverted', 'clock', 'inverted_clock', 'input_low', 'output_low',
+    'failing_edge', 'non_logic', 'power_in', 'power_out', 'passive',
+    'tri_state', 'open_collector', 'open_emitter', 'unconnected',
+})
+
+
+# Indentation strings by level, extended on demand by _tabs()
+_TAB_CACHE = ['']
+
+# Newline followed by the indentation for each level, extended on demand
+# by _line_start()
+_LINE_START_CACHE = ['\n']
+
+
+def _tabs(level: int) -> str:
+    """Return the indentation string for the given level."""
+    if level <= 0:
+        return ''
+    while len(_TAB_CACHE) <= level:
+        _TAB_CACHE.append(_TAB_CACHE[-1] + '\t')
+    return _TAB_CACHE[level]
+
+
+def _line_start(level: int) -> str:
+    """Return a newline followed by the indentation string for the given level."""
+    if level <= 0:
+        return '\n'
+    while len(_LINE_START_CACHE) <= level:
+        _LINE_START_CACHE.append(_LINE_START_CACHE[-1] + '\t')
+    return _LINE_START_CACHE[level]
+
+
+def _reindent_continuation(text: str, level: int) -> str:
+    """
+    Re-indent the continuation lines of a nested list's first line.
+    
+    Atoms containing newlines spill onto extra lines. Those lines are
+    indented to at least the list's level, with their leading whitespace
+    turned into tabs, and blank ones are dropped, matching the layout the
+    formatter has always produced for multi-line atoms.
+    """
+    lines = text.split('\n')
+    result = [lines[0]]
+    for line in lines[1:]:
+        stripped = line.lstrip()
+        if stripped:
+            result.append(_tabs(max(level, len(line) - len(stripped))) + stripped)
+    return '\n'.join(result)
+
+
+def _format_into(value: List, out: List[str], indent: int, nested: bool) -> None:
+    """
+    Append the formatted text of an S-expression list to out.
+    
+    Nested lists are written straight into the same buffer at their final
+    indentation, so no intermediate strings are built per level.
+    
+    Args:
+        value: The list to format
+        out: Buffer the formatted fragments are appended to
+        indent: Indentation level of the list
+        nested: Whether the list is a child of another list
+    """
+    if len(value) == 0:
+        out.append('()')
+        return
+    
+    # Check if first element is a field name that determines quoting
+    first_elem = value[0]
+    quoted_field = isinstance(first_elem, str) and first_elem in QUOTED_VALUE_FIELDS
+    
+    # Separate atoms (simple values) from nested lists
+    atoms = []  # Simple values that go on the same line as keyword
+    nested_lists = []  # Nested lists that go on separate lines
+    
+    for i, item in enumerate(value):
+        item_type = type(item)
+        if i == 0:
+            # First element is the keyword - never quote it
+            atoms.append(str(item))
+        elif item_type is list:
+            # Nested list - written on its own line after the atoms
+            nested_lists.append(item)
+        else:
+            # Atom value - format and add to atoms
+            if i == 1 and quoted_field:
+                # Value immediately after a quoted field keyword should be quoted
+                atoms.append(f'"{escape_string(item)}"')
+            elif i == 1 and first_elem == 'pin':
+                # Determine pin context:
+                # 1. Sheet pins: (pin "A" input ...) - third element is input/output/bidirectional → quote
+                # 2. Library symbol pins: (pin power_out line ...) - third element is line/inverted/etc. → don't quote
+                # 3. Symbol instance pins: (pin 1 (uuid ...)) - third element is a list or missing → quote
+                third_elem = value[2] if len(value) > 2 else None
+                if isinstance(third_elem, str) and third_elem.lower() in _LIBRARY_PIN_TYPES:
+                    # Library symbol pin types should NOT be quoted
+                    atoms.append(str(item))
+                else:
+                    # Sheet pin names and symbol instance pin numbers should be quoted
+                    atoms.append(f'"{escape_string(item)}"')
+            elif i == 2 and first_elem == 'property':
+                # Second value after 'property' (the property value) should also be quoted
+                atoms.append(f'"{escape_string(item)}"')
+            elif i >= 3 and first_elem == 'property' and isinstance(item, str):
+                # Defensive: Skip any extra string arguments after property name and value
+                # Properties should only have 2 strings (name and value), then attributes
+                # This should never happen if properties are created correctly via create_property_element,
+                # but serves as a safety net for malformed data from old files or edge cases
+                continue
+            else:
+                # Format as atom - plain strings and numbers are handled
+                # inline, the same way format_sexp_value would
+                if item_type is str:
+                    if (quoted_field or ' ' in item or '\n' in item or '\t' in item
+                            or '*' in item or '?' in item or '"' in item):
+                        atoms.append(f'"{escape_string(item)}"')
+                    else:
+                        atoms.append(item)
+                elif item_type is int:
+                    atoms.append(str(item))
+                elif item_type is float:
+                    atoms.append(_format_float(item, '', first_elem, indent))
+                else:
+                    formatted_atom = format_sexp_value(item, str(item) if isinstance(item, str) else '', first_elem, indent)
+                    atoms.append(formatted_atom)
+    
+    # First line: (keyword atom1 atom2 ...)
+    first_line = '(' + ' '.join(atoms)
+    
+    # If there are nested lists, we need multi-line format
+    if nested_lists:
+        if nested and '\n' in first_line:
+            first_line = _reindent_continuation(first_line, indent)
+        out.append(first_line)
+        # Each nested list goes on its own line with proper indentation
+        line_start = _line_start(indent + 1)
+        for nested_list in nested_lists:
+            out.append(line_start)
+            _format_into(nested_list, out, indent + 1, True)
+        out.append(_line_start(indent))
+        out.append(')')
+    else:
+        # All atoms - single line
+        line = first_line + ')'
+        if nested and '\n' in line:
+            line = _reindent_continuation(line, indent)
+        out.append(line)
+
+
+def _format_list(value: List, field_name: str, parent_field: str, indent: int) -> str:
+    """Format a list into a single buffer."""
+    out = []
+    _format_into(value, out, indent, False)
+    return ''.join(out)
+
+
+def _format_int(value: int, field_name: str, parent_field: str, indent: int) -> str:
+    """Format an integer."""
+    return str(value)
+
+
+def _format_float(value: float, field_name: str, parent_field: str, indent: int) -> str:
+    """Format a float with appropriate precision."""
+    if value.is_integer():
+        return str(int(value))
+    return f'{value:.10g}'.rstrip('0').rstrip('.')
+
+
+def _format_str(value: str, field_name: str, parent_field: str, indent: int) -> str:
+    """Format a string - quoted if the parent field requires it or it contains spaces/special chars."""
+    if parent_field in QUOTED_VALUE_FIELDS:
+        return f'"{escape_string(value)}"'
+    # Quote if contains spaces or special characters
+    if ' ' in value or '\n' in value or '\t' in value or '*' in value or '?' in value or '"' in value:
+        return f'"{escape_string(value)}"'
+    return value
+
+
+def _format_bool(value: bool, field_name: str, parent_field: str, indent: int) -> str:
+    """Format a boolean as a KiCad yes/no flag."""
+    return 'yes' if value else 'no'
+
+
+def _format_none(value: None, field_name: str, parent_field: str, indent: int) -> str:
+    """Format None as an empty atom."""
+    return ''
+
+
+# Formatters by exact value type. bool has its own entry so that True and
+# False are not formatted as integers.
+_FORMATTERS = {
+    list: _format_list,
+    int: _format_int,
+    float: _format_float,
+    str: _format_str,
+    bool: _format_bool,
+    type(None): _format_none,
+}
 
 
 def format_sexp_value(value: Any, field_name: str = '', parent_field: str = '', indent: int = 0) -> str:
@@ -278,137 +470,21 @@ def format_sexp_value(value: Any, field_name: str = '', parent_field: str = '',
     Returns:
         Formatted S-expression string
     """
-    if isinstance(value, list):
-        # Format as list
-        if len(value) == 0:
-            return '()'
-        
-        # Check if first element is a field name that determines quoting
-        first_elem = value[0] if len(value) > 0 else ''
-        
-        indent_str = '\t' * indent
-        next_indent_str = '\t' * (indent + 1)
-        
-        # Separate atoms (simple values) from nested lists
-        atoms = []  # Simple values that go on the same line as keyword
-        nested_lists = []  # Nested lists that go on separate lines
-        
-        for i, item in enumerate(value):
-            if i == 0:
-                # First element is the keyword - never quote it
-                atoms.append(str(item))
-            elif isinstance(item, list):
-                # Nested list - format it and add to nested_lists
-                formatted_nested = format_sexp_value(item, str(item[0]) if len(item) > 0 and isinstance(item[0], str) else '', first_elem, indent + 1)
-                nested_lists.append(formatted_nested)
-            else:
-                # Atom value - format and add to atoms
-                if i == 1 and first_elem in QUOTED_VALUE_FIELDS:
-                    # Value immediately after a quoted field keyword should be quoted
-                    atoms.append(f'"{escape_string(item)}"')
-                elif i == 1 and first_elem == 'pin':
-                    # Determine pin context:
-                    # 1. Sheet pins: (pin "A" input ...) - third element is input/output/bidirectional → quote
-                    # 2. Library symbol pins: (pin power_out line ...) - third element is line/inverted/etc. → don't quote
-                    # 3. Symbol instance pins: (pin 1 (uuid ...)) - third element is a list or missing → quote
-                    is_sheet_pin = False
-                    is_library_symbol_pin = False
-                    
-                    if len(value) > 2:
-                        third_elem = value[2]
-                        if isinstance(third_elem, str):
-                            third_elem_lower = third_elem.lower()
-                            if third_elem_lower in ('input', 'output', 'bidirectional'):
-                                is_sheet_pin = True
-                            elif third_elem_lower in ('line', 'inverted', 'clock', 'inverted_clock', 
-                                                      'input_low', 'output_low', 'failing_edge', 
-                                                      'non_logic', 'power_in', 'power_out', 
-                                                      'passive', 'tri_state', 'open_collector',
-                                                      'open_emitter', 'unconnected'):
-                                is_library_symbol_pin = True
-                        # If third element is a list (like ['uuid', ...]), it's a symbol instance pin
-                    
-                    if is_sheet_pin:
-                        # Sheet pin names should be quoted
-                        atoms.append(f'"{escape_string(item)}"')
-                    elif is_library_symbol_pin:
-                        # Library symbol pin types should NOT be quoted
-                        atoms.append(str(item))
-                    else:
-                        # Symbol instance pins (pin numbers) should be quoted
-                        atoms.append(f'"{escape_string(item)}"')
-                elif i == 2 and first_elem == 'property':
-                    # Second value after 'property' (the property value) should also be quoted
-                    atoms.append(f'"{escape_string(item)}"')
-                elif i >= 3 and first_elem == 'property' and isinstance(item, str):
-                    # Defensive: Skip any extra string arguments after property name and value
-                    # Properties should only have 2 strings (name and value), then attributes
-                    # This should never happen if properties are created correctly via create_property_element,
-                    # but serves as a safety net for malformed data from old files or edge cases
-                    continue
-                else:
-                    # Format as atom
-                    formatted_atom = format_sexp_value(item, str(item) if isinstance(item, str) else '', first_elem, indent)
-                    atoms.append(formatted_atom)
-        
-        # Build the formatted string
-        # First line: (keyword atom1 atom2 ...)
-        first_line = '(' + ' '.join(atoms)
-        
-        # If there are nested lists, we need multi-line format
-        if nested_lists:
-            lines = [first_line]
-            for nested in nested_lists:
-                # Each nested list goes on its own line with proper indentation
-                if '\n' in nested:
-                    # Multi-line nested list
-                    # The nested list was formatted with indent+1, so it has base indent of (indent+1) tabs
-                    # We want to add it with base indent of next_indent_str (which is also indent+1 tabs)
-                    # So we need to: remove the base indent from the nested list and add next_indent_str
-                    nested_lines = nested.split('\n')
-                    base_indent_tabs = indent + 1  # The indent level the nested list was formatted with
-                    
-                    for nested_line in nested_lines:
-                        if nested_line.strip():  # Skip empty lines
-                            # Count existing tabs
-                            existing_tabs = len(nested_line) - len(nested_line.lstrip())
-                            # Calculate relative indent (beyond the base)
-                            relative_tabs = max(0, existing_tabs - base_indent_tabs)
-                            # Add our base indent plus the relative indent
-                            lines.append(next_indent_str + '\t' * relative_tabs + nested_line.lstrip())
-                else:
-                    # Single-line nested list
-                    lines.append(next_indent_str + nested)
-            lines.append(indent_str + ')')
-            return '\n'.join(lines)
-        else:
-            # All atoms - single line
-            return first_line + ')'
-    
-    elif isinstance(value, (int, float)):
-        # Format number
-        if isinstance(value, float):
-            # Format with appropriate precision
-            if value.is_integer():
-                return str(int(value))
-            return f'{value:.10g}'.rstrip('0').rstrip('.')
-        return str(value)
-    
-    elif isinstance(value, str):
-        # Format string - quote if parent field requires quoting or contains spaces/special chars
-        if parent_field in QUOTED_VALUE_FIELDS:
-            return f'"{escape_string(value)}"'
-        # Quote if contains spaces or special characters
-        if ' ' in value or '\n' in value or '\t' in value or '*' in value or '?' in value or '"' in value:
-            return f'"{escape_string(value)}"'
-        return value
+    formatter = _FORMATTERS.get(type(value))
+    if formatter is not None:
+        return formatter(value, field_name, parent_field, indent)
     
+    # Subclasses of the basic types
+    if isinstance(value, list):
+        return _format_list(value, field_name, parent_field, indent)
     elif isinstance(value, bool):
-        return 'yes' if value else 'no'
-    
-    elif value is None:
-        return ''
-    
+        return _format_bool(value, field_name, parent_field, indent)
+    elif isinstance(value, float):
+        return _format_float(value, field_name, parent_field, indent)
+    elif isinstance(value, int):
+        return _format_int(value, field_name, parent_field, indent)
+    elif isinstance(value, str):
+        return _format_str(value, field_name, parent_field, indent)
     else:
         return str(value)
 
@@ -442,6 +518,35 @@ def format_sexp(data: Any, indent: int = 0) -> str:
     else:
         return format_sexp_value(data, '', '', indent)
 
+
+def format_sexp_to(data: Any, out: TextIO, indent: int = 0) -> None:
+    """
+    Write Python data structure as S-expression text to a text stream.
+    
+    Produces the same text as format_sexp, but hands the formatted fragments
+    to the stream instead of joining them into one string first.
+    
+    Args:
+        data: Python data structure (list, dict, etc.)
+        out: Text stream to write to
+        indent: Current indentation level
+    """
+    if isinstance(data, list):
+        fragments = []
+        _format_into(data, fragments, indent, False)
+        out.writelines(fragments)
+    
+    elif isinstance(data, dict):
+        # Convert dict to list format: (key value ...)
+        items = []
+        for key, value in data.items():
+            items.append(key)
+            items.append(value)
+        format_sexp_to(items, out, indent)
+    
+    else:
+        out.write(format_sexp_value(data, '', '', indent))
+
 # =============================================================================
 # Symbol Library Loader
 # =============================================================================
@@ -528,9 +633,12 @@ def _find_kicad_symbol_path() -> str:
 
 KICAD_SYMBOL_PATH = _find_kicad_symbol_path()
 
-# Cache for parsed library files (library_name -> parsed_lib_data)
+# Cache for parsed library files (library_name -> (parsed_lib_data, symbol_name -> symbol))
 _library_cache = {}
 
+# Cache for resolved symbols ((lib_id, search_paths) -> symbol definition)
+_symbol_result_cache: Dict[Tuple[str, Tuple[str, ...]], List] = {}
+
 
 def find_element(sexp_list: List, name: str) -> Optional[List]:
     """Find first element with given name in S-expression list."""
@@ -772,6 +880,10 @@ def load_symbol_from_library(lib_id: str, symbol_paths: Union[str, List[str]] =
     if ':' not in lib_id:
         return None
     
+    # Only top-level lookups are memoized; nested lookups for base symbols
+    # depend on the visited set when inheritance is circular
+    memoize = visited is None
+    
     # Initialize visited set if not provided
     if visited is None:
         visited = set()
@@ -798,6 +910,12 @@ def load_symbol_from_library(lib_id: str, symbol_paths: Union[str, List[str]] =
     else:
         search_paths = symbol_paths
     
+    # Return a copy of a previously resolved symbol; callers may modify it
+    cache_key = (lib_id, tuple(search_paths))
+    if memoize and cache_key in _symbol_result_cache:
+        visited.remove(lib_id)
+        return copy.deepcopy(_symbol_result_cache[cache_key])
+    
     library_name, symbol_name = lib_id.split(':', 1)
     
     # Search across all provided paths
@@ -830,52 +948,58 @@ def load_symbol_from_library(lib_id: str, symbol_paths: Union[str, List[str]] =
                 visited.remove(lib_id)
                 return None
             
+            # Index symbols by name once per library; the first definition of
+            # a name wins, matching the previous linear scan
+            name_index = {}
+            for symbol in find_elements(lib_data, 'symbol'):
+                sym_name = get_atom_value(symbol, 1, None)
+                if isinstance(sym_name, str):
+                    name_index.setdefault(sym_name, symbol)
+            
             # Cache the parsed library
-            _library_cache[library_name] = lib_data
+            _library_cache[library_name] = (lib_data, name_index)
         
-        # Get cached library data
-        lib_data = _library_cache[library_name]
+        # Get cached symbol index
+        lib_data, name_index = _library_cache[library_name]
         
-        # Find all symbol definitions
-        symbols = find_elements(lib_data, 'symbol')
+        symbol = name_index.get(symbol_name)
+        if symbol is None:
+            logger.warning(f"Warning: Symbol '{symbol_name}' not found in library '{library_name}'")
+            visited.remove(lib_id)
+            return None
         
-        for symbol in symbols:
-            # Get symbol name (second element)
-            sym_name = get_atom_value(symbol, 1, None)
-            if sym_name == symbol_name:
-                # Found the symbol - create result with lib_id prefix
-                result = ['symbol', lib_id] + symbol[2:]
-                
-                # Check if this symbol extends another symbol
-                extends_elem = find_element(result, 'extends')
-                if extends_elem:
-                    # Get the base symbol name
-                    base_symbol_name = get_atom_value(extends_elem, 1, None)
-                    if base_symbol_name:
-                        # Base symbol is in the same library
-                        base_lib_id = f'{library_name}:{base_symbol_name}'
-                        
-                        # Recursively load the base symbol (using same search paths)
-                        base_symbol = load_symbol_from_library(base_lib_id, symbol_paths, visited.copy())
-                        
-                        if base_symbol:
-                            # Merge base symbol into extending symbol
-                            result = merge_symbol_with_base(base_symbol, result)
-                        else:
-                            logger.warning(f"Warning: Base symbol '{base_symbol_name}' not found for extending symbol '{lib_id}'")
-                            # Continue with extending symbol as-is (without extends field)
-                            # Remove the extends element
-                            result = ['symbol', lib_id]
-                            for elem in symbol[2:]:
-                                if isinstance(elem, list) and len(elem) > 0 and elem[0] != 'extends':
-                                    result.append(elem)
-                
-                visited.remove(lib_id)
-                return result
+        # Found the symbol - create result with lib_id prefix
+        result = ['symbol', lib_id] + symbol[2:]
+        
+        # Check if this symbol extends another symbol
+        extends_elem = find_element(result, 'extends')
+        if extends_elem:
+            # Get the base symbol name
+            base_symbol_name = get_atom_value(extends_elem, 1, None)
+            if base_symbol_name:
+                # Base symbol is in the same library
+                base_lib_id = f'{library_name}:{base_symbol_name}'
+        
+                # Recursively load the base symbol (using same search paths)
+                base_symbol = load_symbol_from_library(base_lib_id, symbol_paths, visited.copy())
+        
+                if base_symbol:
+                    # Merge base symbol into extending symbol
+                    result = merge_symbol_with_base(base_symbol, result)
+                else:
+                    logger.warning(f"Warning: Base symbol '{base_symbol_name}' not found for extending symbol '{lib_id}'")
+                    # Continue with extending symbol as-is (without extends field)
+                    # Remove the extends element
+                    result = ['symbol', lib_id]
+                    for elem in symbol[2:]:
+                        if isinstance(elem, list) and len(elem) > 0 and elem[0] != 'extends':
+                            result.append(elem)
+        
+        if memoize:
+            _symbol_result_cache[cache_key] = copy.deepcopy(result)
         
-        logger.warning(f"Warning: Symbol '{symbol_name}' not found in library '{library_name}'")
         visited.remove(lib_id)
-        return None
+        return result
     
     except Exception as e:
         logger.error(f"Error loading symbol from {library_file}: {e}")
@@ -927,19 +1051,23 @@ def transform_pin_coordinate(pin_offset: Tuple[float, float, int],
     return (x_rot + x_pos, y_rot + y_pos)
 
 
-def extract_pin_info_from_symbol(symbol_def: List, pin_number: str, unit: int = 1, body_style: int = 1) -> Optional[Tuple[float, float, int]]:
+def get_pin_positions(symbol_def: List, unit: int = 1, body_style: int = 1) -> Dict[str, Tuple[float, float, int]]:
     """
-    Extract pin position and rotation from symbol definition.
+    Extract the position and rotation of every pin of one unit/body style.
+    
+    Builds the lookup in a single pass so callers placing many pins of the
+    same component do not rescan the symbol definition for each pin.
     
     Args:
         symbol_def: Symbol definition from library
-        pin_number: Pin number as string
         unit: Symbol unit (default 1)
         body_style: Body style (default 1)
     
     Returns:
-        (x_offset, y_offset, rotation) or None if not found
+        Dictionary of {pin_number: (x_offset, y_offset, rotation)}
     """
+    pin_positions = {}
+    
     # Find nested symbol definitions (units/alternates)
     nested_symbols = find_elements(symbol_def, 'symbol')
     
@@ -984,8 +1112,8 @@ def extract_pin_info_from_symbol(symbol_def: List, pin_number: str, unit: int =
             if not number_elem:
                 continue
             
-            pin_num = get_atom_value(number_elem, 1, None)
-            if str(pin_num) != str(pin_number):
+            pin_num = str(get_atom_value(number_elem, 1, None))
+            if pin_num in pin_positions:
                 continue
             
             # Get pin position (at x y rot)
@@ -997,11 +1125,27 @@ def extract_pin_info_from_symbol(symbol_def: List, pin_number: str, unit: int =
                 x = float(at_elem[1])
                 y = float(at_elem[2])
                 rot = int(float(at_elem[3])) if len(at_elem) > 3 else 0
-                return (x, y, rot)
+                pin_positions[pin_num] = (x, y, rot)
             except (ValueError, TypeError, IndexError):
                 continue
     
-    return None
+    return pin_positions
+
+
+def extract_pin_info_from_symbol(symbol_def: List, pin_number: str, unit: int = 1, body_style: int = 1) -> Optional[Tuple[float, float, int]]:
+    """
+    Extract pin position and rotation from symbol definition.
+    
+    Args:
+        symbol_def: Symbol definition from library
+        pin_number: Pin number as string
+        unit: Symbol unit (default 1)
+        body_style: Body style (default 1)
+    
+    Returns:
+        (x_offset, y_offset, rotation) or None if not found
+    """
+    return get_pin_positions(symbol_def, unit, body_style).get(str(pin_number))
 
 
 def get_valid_unit_body_style_combinations(symbol_def: List) -> List[Tuple[int, int]]:
@@ -1943,6 +2087,7 @@ def convert_component(comp: Dict[str, Any], lib_symbols_cache: Dict[str, List],
     labels = []
     no_connects = []  # For DNC pins
     # symbol_def already assigned above when extracting properties
+    pin_positions = get_pin_positions(symbol_def, unit=unit, body_style=body_style)
     
     for pin_num, net_name in pins.items():
         # Skip pins with net "NONE" (unconnected)
@@ -1950,7 +2095,7 @@ def convert_component(comp: Dict[str, Any], lib_symbols_cache: Dict[str, List],
             continue
         
         # Get pin info from symbol definition
-        pin_info = extract_pin_info_from_symbol(symbol_def, pin_num, unit=unit, body_style=body_style)
+        pin_info = pin_positions.get(str(pin_num))
         if pin_info:
             x_off, y_off, pin_rot = pin_info
             # Transform pin position
@@ -2787,7 +2932,8 @@ def process_cwires(cwires: List[Dict[str, Any]],
 
 def trace_json_to_sexp(trace_json: List[Dict[str, Any]], 
                        existing_sch_content: Optional[str] = None,
-                       symbol_paths: Union[str, List[str]] = None) -> str:
+                       symbol_paths: Union[str, List[str]] = None,
+                       out: Optional[TextIO] = None) -> Optional[str]:
     """
     Convert trace JSON format to KiCad S-expression format.
     
@@ -2797,9 +2943,10 @@ def trace_json_to_sexp(trace_json: List[Dict[str, Any]],
                              If None, generates from scratch (backward compatible).
         symbol_paths: Path(s) to KiCad symbols directory(ies). Can be a single string or list of strings.
                      If None, uses default KICAD_SYMBOL_PATH or environment variable.
+        out: Optional text stream to write the output to instead of returning it
     
     Returns:
-        Complete kicad_sch S-expression string
+        Complete kicad_sch S-expression string, or None if out was given
     """
     import time
     start_time = time.time()
@@ -3033,13 +3180,14 @@ def trace_json_to_sexp(trace_json: List[Dict[str, Any]],
                 
                 # Generate labels for pins with net assignments
                 pins = comp.get('pins', {})
+                pin_positions = get_pin_positions(symbol_def, unit=unit, body_style=body_style)
                 for pin_num, net_name in pins.items():
                     # Skip pins with net "NONE" (unconnected)
                     if net_name == "NONE":
                         continue
                     
                     # Get pin info from symbol definition
-                    pin_info = extract_pin_info_from_symbol(symbol_def, pin_num, unit=unit, body_style=body_style)
+                    pin_info = pin_positions.get(str(pin_num))
                     if pin_info:
                         x_off, y_off, pin_rot = pin_info
                         # Transform pin position
@@ -3086,10 +3234,13 @@ def trace_json_to_sexp(trace_json: List[Dict[str, Any]],
     
     # Route cwires using A* algorithm (cwires without valid cwiredefs are autorouted)
     # Net-aware routing: routes can terminate early when reaching same-net wires
-    routed_wires, routing_junctions, wires_to_remove = route_cwires(
-        cwire_routing_pairs, trace_json, lib_symbols_cache,
-        transform_pin_coordinate, extract_pin_info_from_symbol
-    )
+    if cwire_routing_pairs:
+        routed_wires, routing_junctions, wires_to_remove = _get_route_cwires()(
+            cwire_routing_pairs, trace_json, lib_symbols_cache,
+            transform_pin_coordinate, extract_pin_info_from_symbol
+        )
+    else:
+        routed_wires, routing_junctions, wires_to_remove = [], [], []
     
     # Remove wires that were split during routing
     if wires_to_remove:
@@ -3310,8 +3461,12 @@ def trace_json_to_sexp(trace_json: List[Dict[str, Any]],
     else:
         kicad_sch.append(['embedded_fonts', 'no'])
     
-    # Format as S-expression string
-    result = format_sexp(kicad_sch)
+    # Format as S-expression string, or straight into the output stream
+    if out is not None:
+        format_sexp_to(kicad_sch, out)
+        result = None
+    else:
+        result = format_sexp(kicad_sch)
     
     end_time = time.time()
     print(f"Conversion complete in {end_time - start_time} seconds")
@@ -53,6 +53,9 @@ class TraceParseError(Exception):
 @dataclass
 class Token:
     """Represents a token with type, value, and position."""
+    # One instance per lexed token; slots keep them small and fast to access
+    __slots__ = ("type", "value", "line", "column")
+    
     type: str
     value: Any
     line: int